@@ -3,9 +3,11 @@
 from .calendars import Calendar
 from .families import FamilyAdmin
 from .persons import PersonAdmin
+from .reminders import ReminderLogAdmin
 
 __all__ = [
     "Calendar",
     "FamilyAdmin",
     "PersonAdmin",
+    "ReminderLogAdmin",
 ]
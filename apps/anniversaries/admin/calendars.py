@@ -31,6 +31,7 @@ class CalendarAdmin(SensitiveAdminMixin, admin.ModelAdmin):
     list_display = (
         "__str__",
         "_families",
+        "years_behind",
         "years_ahead",
         "_url",
     )
@@ -52,7 +53,8 @@ class CalendarAdmin(SensitiveAdminMixin, admin.ModelAdmin):
             {
                 "classes": ["collapse"],
                 "fields": [
-                    "years_ahead",
+                    ("years_behind", "years_ahead"),
+                    "use_recurring_events",
                     "hide_death_anniversaries",
                     ("created_by", "created_at"),
                     ("changed_by", "changed_at"),
@@ -64,8 +66,11 @@ class CalendarAdmin(SensitiveAdminMixin, admin.ModelAdmin):
     filter_horizontal = ("families",)
 
     def get_queryset(self, request: HttpRequest) -> QuerySet[Calendar]:
-        """Allowed only for the creator of the object and superusers."""
-        queryset = super().get_queryset(request)
+        """Allowed only for the creator of the object and superusers.
+
+        Related objects displayed in the changelist are fetched with a fixed
+        number of queries."""
+        queryset = super().get_queryset(request).prefetch_related("families")
         return (
             queryset
             if request.user.is_superuser  # type: ignore
@@ -6,7 +6,7 @@ from typing import Any
 from anniversaries.models import Family, Person
 from core.admin.mixins import SensitiveAdminMixin
 from django.contrib import admin
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.db.models.query import QuerySet
 from django.http import HttpRequest
 from django.utils.html import format_html
@@ -18,10 +18,11 @@ logger = logging.getLogger(__name__)
 class FamilyAdmin(SensitiveAdminMixin, admin.ModelAdmin):
     """Encapsulate all admin options and functionality for the model 'Family'."""
 
-    @admin.display(description=_("persons"))
+    @admin.display(description=_("persons"), ordering="person_number")
     def _person_number(self, obj: Family) -> int | None:
-        """Returns the number of people in a family."""
-        return obj.anniversaries_family_members.distinct().count()
+        """Returns the number of people in a family, as annotated by the
+        database."""
+        return obj.person_number  # type: ignore[attr-defined]
 
     @admin.display(description=_("users"))
     def _users(self, obj: Person) -> str:
@@ -30,6 +31,8 @@ class FamilyAdmin(SensitiveAdminMixin, admin.ModelAdmin):
 
     list_display = ("__str__", "_person_number", "created_by", "_users")
 
+    list_select_related = ("created_by",)
+
     list_filter = ("created_by",)
 
     search_fields = ("title",)
@@ -59,8 +62,16 @@ class FamilyAdmin(SensitiveAdminMixin, admin.ModelAdmin):
     filter_horizontal = ("users",)
 
     def get_queryset(self, request: HttpRequest) -> QuerySet[Family]:
-        """If not superuser, filter by creator and authorized users."""
-        queryset = super().get_queryset(request)
+        """If not superuser, filter by creator and authorized users.
+
+        Related objects displayed in the changelist are fetched with a fixed
+        number of queries."""
+        queryset = (
+            super()
+            .get_queryset(request)
+            .annotate(person_number=Count("anniversaries_family_member", distinct=True))
+            .prefetch_related("users")
+        )
         return (
             queryset
             if request.user.is_superuser  # type: ignore
@@ -4,8 +4,10 @@ import logging
 from typing import Any
 
 from anniversaries.models import Family, Person
-from core.admin.mixins import SensitiveAdminMixin
+from core.admin.filters import TopValuesFieldListFilter
+from core.admin.mixins import LargeTableAdminMixin, SensitiveAdminMixin
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
 from django.db.models import Q
 from django.db.models.fields.related import ManyToManyField
 from django.db.models.query import QuerySet
@@ -42,12 +44,12 @@ class IsAliveListFilter(admin.SimpleListFilter):
         return queryset
 
 
-class PersonAdmin(SensitiveAdminMixin, admin.ModelAdmin):
+class PersonAdmin(SensitiveAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
     """Encapsulate all admin options and functionality for the model 'Person'."""
 
-    @admin.display(description=_("age"), ordering="-date_of_birth")
+    @admin.display(description=_("age"), ordering="current_age")
     def _age(self, obj: Person) -> int | None:
-        """Returns the current age of the person."""
+        """Returns the current age of the person, as annotated by the database."""
         return obj.get_current_age()
 
     @admin.display(description=_("families"))
@@ -72,12 +74,13 @@ class PersonAdmin(SensitiveAdminMixin, admin.ModelAdmin):
     list_filter = (
         ("families", admin.RelatedOnlyFieldListFilter),
         "sex",
-        "birth_name",
-        "married_name",
+        ("birth_name", TopValuesFieldListFilter),
+        ("married_name", TopValuesFieldListFilter),
         "species",
         IsAliveListFilter,
     )
 
+    # Shows the search box, see 'get_search_results':
     search_fields = (
         "nickname",
         "first_name",
@@ -116,8 +119,16 @@ class PersonAdmin(SensitiveAdminMixin, admin.ModelAdmin):
     ]
 
     def get_queryset(self, request: HttpRequest) -> QuerySet[Person]:
-        """If not superuser, filter by creator and authorized users."""
-        queryset = super().get_queryset(request)
+        """If not superuser, filter by creator and authorized users.
+
+        Related objects displayed in the changelist are fetched with a fixed
+        number of queries."""
+        queryset = (
+            super()
+            .get_queryset(request)
+            .with_current_age()  # type: ignore
+            .prefetch_related("families")
+        )
         return (
             queryset
             if request.user.is_superuser  # type: ignore
@@ -126,6 +137,17 @@ class PersonAdmin(SensitiveAdminMixin, admin.ModelAdmin):
             ).distinct()
         )
 
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet[Person], search_term: str
+    ) -> tuple[QuerySet[Person], bool]:
+        """Returns people matching the search term, using the full-text index
+        over names rather than 'search_fields' lookups, and ordered by relevance
+        unless another order has been requested."""
+        results = queryset.search(search_term)  # type: ignore[attr-defined]
+        if "search_rank" in results.query.annotations and ORDER_VAR not in request.GET:
+            results = results.order_by("-search_rank", *queryset.query.order_by)
+        return results, False
+
     def get_readonly_fields(
         self, request: HttpRequest, obj: Person | None = None
     ) -> list[str] | tuple[Any, ...]:
@@ -0,0 +1,33 @@
+"""Configuration of the 'anniversaries' application administration site."""
+
+from anniversaries.models import ReminderLog
+from django.contrib import admin
+from django.http import HttpRequest
+
+
+class ReminderLogAdmin(admin.ModelAdmin):
+    """Encapsulate all admin options and functionality for the model
+    'ReminderLog'."""
+
+    list_display = ("person", "event_date", "kind", "user", "sent_at")
+
+    list_filter = ("kind", "event_date")
+
+    list_select_related = ("person", "user")
+
+    search_fields = ("user__username", "user__email")
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        """Reminder logs are only written by the 'send_event_reminders' command."""
+        del request
+        return False
+
+    def has_change_permission(
+        self, request: HttpRequest, obj: ReminderLog | None = None
+    ) -> bool:
+        """Reminder logs are only written by the 'send_event_reminders' command."""
+        del request, obj
+        return False
+
+
+admin.site.register(ReminderLog, ReminderLogAdmin)
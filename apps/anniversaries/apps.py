@@ -11,3 +11,7 @@ class AnniversariesConfig(AppConfig):
     label: str = "anniversaries"
     name: str = "anniversaries"
     verbose_name: StrOrPromise = _("Anniversaries")
+
+    def ready(self) -> None:
+        """Connects the signal receivers of the application."""
+        from anniversaries import signals  # noqa: F401 # pylint: disable=import-outside-toplevel,unused-import
@@ -0,0 +1,301 @@
+"""Cache of the calendars rendered by the 'anniversaries' application."""
+
+import asyncio
+import logging
+import time
+from datetime import date
+from typing import AsyncIterator, Iterable, Iterator, NamedTuple
+from uuid import UUID, uuid4
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+CACHE_PREFIX: str = "anniversaries"
+ICALENDAR_CACHE_TIMEOUT: int = 60 * 60 * 24  # one day, keys roll over at midnight
+ICALENDAR_CACHE_HITS_KEY: str = f"{CACHE_PREFIX}:icalendar:hits"
+ICALENDAR_CACHE_MISSES_KEY: str = f"{CACHE_PREFIX}:icalendar:misses"
+ICALENDAR_STALE_CACHE_TIMEOUT: int = 60 * 60 * 24 * 7  # one week
+ICALENDAR_LOCK_TIMEOUT: int = 60  # seconds, in case a build never completes
+ICALENDAR_LOCK_WAIT: float = 10  # seconds
+ICALENDAR_LOCK_POLL_INTERVAL: float = 0.1  # seconds
+UPCOMING_BIRTHDAYS_CACHE_TIMEOUT: int = 60 * 60 * 24  # one day
+
+logger = logging.getLogger(__name__)
+
+
+def _get_version(key: str) -> int:
+    """Returns the current version stored under a key, initializes it if
+    required."""
+    version = cache.get(key)
+    if version is None:
+        # A timestamp never collides with a version used before an eviction:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key: str) -> None:
+    """Increments the version stored under a key."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Raised when the key does not exist (yet or anymore).
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_calendar_version_key(calendar_id: UUID) -> str:
+    """Returns the cache key of the version of a calendar."""
+    return f"{CACHE_PREFIX}:calendar:{calendar_id}:version"
+
+
+def get_calendar_version(calendar_id: UUID) -> int:
+    """Returns the current version of a calendar, initializes it if required."""
+    return _get_version(get_calendar_version_key(calendar_id))
+
+
+def bump_calendar_versions(calendar_ids: Iterable[UUID]) -> None:
+    """Invalidates everything cached for the given calendars."""
+    for calendar_id in set(calendar_ids):
+        _bump_version(get_calendar_version_key(calendar_id))
+        logger.debug('Cache of calendar "%s" invalidated.', calendar_id)
+
+
+def get_owner_version_key(owner_id: int) -> str:
+    """Returns the cache key of the version of the calendars of an owner."""
+    return f"{CACHE_PREFIX}:owner:{owner_id}:version"
+
+
+def get_owner_version(owner_id: int) -> int:
+    """Returns the current version of the calendars of an owner, initializes it
+    if required."""
+    return _get_version(get_owner_version_key(owner_id))
+
+
+def bump_owner_versions(owner_ids: Iterable[int]) -> None:
+    """Invalidates everything cached for the calendars of the given owners."""
+    for owner_id in set(owner_ids):
+        _bump_version(get_owner_version_key(owner_id))
+        logger.debug('Cache of the calendars of user "%s" invalidated.', owner_id)
+
+
+def get_upcoming_birthdays_key(owner_id: int, days: int) -> str:
+    """Returns the cache key of the upcoming birthdays of the calendars of an
+    owner.
+
+    The key depends on the date because the window of upcoming days moves with
+    it."""
+    return ":".join(
+        [
+            CACHE_PREFIX,
+            "upcoming_birthdays",
+            str(owner_id),
+            str(get_owner_version(owner_id)),
+            date.today().isoformat(),
+            str(days),
+        ]
+    )
+
+
+def get_icalendar_key(calendar_id: UUID) -> str:
+    """Returns the cache key of the iCalendar of a calendar.
+
+    The key depends on the date because ages in event summaries change with it,
+    and on the language because events are translated."""
+    return ":".join(
+        [
+            CACHE_PREFIX,
+            "icalendar",
+            str(calendar_id),
+            str(get_calendar_version(calendar_id)),
+            date.today().isoformat(),
+            str(get_language()),
+        ]
+    )
+
+
+def get_stale_icalendar_key(key: str) -> str:
+    """Returns the cache key of the last iCalendar built for the same calendar
+    and language as the given key, whatever its version and date."""
+    prefix, name, calendar_id, _version, _date, language = key.split(":")
+    return ":".join([prefix, name, calendar_id, "stale", language])
+
+
+def get_icalendar_lock_key(key: str) -> str:
+    """Returns the cache key of the lock taken to build an iCalendar."""
+    return f"{key}:lock"
+
+
+def _increment(key: str) -> None:
+    """Increments a counter, initializes it if required."""
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Raised when the key has been evicted in the meantime.
+        cache.set(key, 1, timeout=None)
+
+
+def get_cached_icalendar(key: str) -> bytes | None:
+    """Returns the cached iCalendar or None."""
+    icalendar: bytes | None = cache.get(key)
+    _increment(
+        ICALENDAR_CACHE_MISSES_KEY if icalendar is None else ICALENDAR_CACHE_HITS_KEY
+    )
+    return icalendar
+
+
+class CachedICalendar(NamedTuple):
+    """An iCalendar read from the cache, possibly stale, or the permission to
+    build it: the token of the lock taken, if any."""
+
+    content: bytes | None
+    stale: bool = False
+    lock: str | None = None
+
+
+def _try_cached_icalendar(
+    key: str, first: bool = False, allow_stale: bool = False
+) -> CachedICalendar | None:
+    """Returns the cached iCalendar, the lock to build it, or a stale copy if
+    allowed. Returns None when another request is building it."""
+    icalendar = get_cached_icalendar(key) if first else cache.get(key)
+    if icalendar is not None:
+        return CachedICalendar(icalendar)
+    lock = uuid4().hex
+    if cache.add(get_icalendar_lock_key(key), lock, timeout=ICALENDAR_LOCK_TIMEOUT):
+        return CachedICalendar(None, lock=lock)
+    if allow_stale and (stale := cache.get(get_stale_icalendar_key(key))) is not None:
+        return CachedICalendar(stale, stale=True)
+    return None
+
+
+def get_cached_icalendar_or_lock(key: str, allow_stale: bool = True) -> CachedICalendar:
+    """Returns the cached iCalendar, or takes the lock to build it.
+
+    Concurrent requests missing the cache are coalesced: while one request
+    builds the iCalendar, the others get the last iCalendar built, which is
+    stale, or wait for the new one. When the wait is too long, they are allowed
+    to build it too, without the lock. The lock must be released with
+    'release_icalendar_lock'."""
+    cached = _try_cached_icalendar(key, first=True, allow_stale=allow_stale)
+    deadline = time.monotonic() + ICALENDAR_LOCK_WAIT
+    while cached is None and time.monotonic() < deadline:
+        time.sleep(ICALENDAR_LOCK_POLL_INTERVAL)
+        cached = _try_cached_icalendar(key)
+    return cached or CachedICalendar(None)
+
+
+async def aget_cached_icalendar_or_lock(
+    key: str, allow_stale: bool = True
+) -> CachedICalendar:
+    """Async version of 'get_cached_icalendar_or_lock', waiting without holding a
+    thread."""
+    cached = await sync_to_async(_try_cached_icalendar)(
+        key, first=True, allow_stale=allow_stale
+    )
+    deadline = time.monotonic() + ICALENDAR_LOCK_WAIT
+    while cached is None and time.monotonic() < deadline:
+        await asyncio.sleep(ICALENDAR_LOCK_POLL_INTERVAL)
+        cached = await sync_to_async(_try_cached_icalendar)(key)
+    return cached or CachedICalendar(None)
+
+
+def release_icalendar_lock(key: str, lock: str | None) -> None:
+    """Releases the lock taken to build an iCalendar, unless it is held by
+    another request: the build did not get the lock or it expired meanwhile."""
+    if lock is not None and cache.get(get_icalendar_lock_key(key)) == lock:
+        cache.delete(get_icalendar_lock_key(key))
+
+
+def set_cached_icalendar(key: str, icalendar: bytes) -> None:
+    """Caches the iCalendar, and keeps a copy to serve while the next version is
+    being built.
+
+    The key must have been computed before building the iCalendar so that a
+    version bumped in the meantime is not overwritten with outdated content."""
+    cache.set(key, icalendar, ICALENDAR_CACHE_TIMEOUT)
+    cache.set(get_stale_icalendar_key(key), icalendar, ICALENDAR_STALE_CACHE_TIMEOUT)
+
+
+class ICalendarBuild:
+    """Chunks of an iCalendar, cached once they have all been consumed.
+
+    The lock taken to build the iCalendar, if any, is released when it is
+    cached, or when the build is closed, like responses do once sent or aborted
+    (even before the first chunk)."""
+
+    def __init__(
+        self, key: str, chunks: Iterator[bytes], lock: str | None = None
+    ) -> None:
+        self.key = key
+        self.chunks = chunks
+        self.lock = lock
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer: list[bytes] = []
+        try:
+            for chunk in self.chunks:
+                buffer.append(chunk)
+                yield chunk
+            set_cached_icalendar(self.key, b"".join(buffer))
+        finally:
+            release_icalendar_lock(self.key, self.lock)
+
+    def close(self) -> None:
+        """Releases the lock taken to build the iCalendar."""
+        release_icalendar_lock(self.key, self.lock)
+
+
+class AsyncICalendarBuild:
+    """Async version of 'ICalendarBuild'."""
+
+    def __init__(
+        self, key: str, chunks: AsyncIterator[bytes], lock: str | None = None
+    ) -> None:
+        self.key = key
+        self.chunks = chunks
+        self.lock = lock
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        buffer: list[bytes] = []
+        try:
+            async for chunk in self.chunks:
+                buffer.append(chunk)
+                yield chunk
+            await sync_to_async(set_cached_icalendar)(self.key, b"".join(buffer))
+        finally:
+            await sync_to_async(release_icalendar_lock)(self.key, self.lock)
+
+    def close(self) -> None:
+        """Releases the lock taken to build the iCalendar."""
+        release_icalendar_lock(self.key, self.lock)
+
+
+def iter_and_cache_icalendar(
+    key: str, chunks: Iterator[bytes], lock: str | None = None
+) -> ICalendarBuild:
+    """Yields the chunks of an iCalendar and caches it once they have all been
+    consumed, then releases the given lock."""
+    return ICalendarBuild(key, chunks, lock)
+
+
+def aiter_and_cache_icalendar(
+    key: str, chunks: AsyncIterator[bytes], lock: str | None = None
+) -> AsyncICalendarBuild:
+    """Async version of 'iter_and_cache_icalendar'."""
+    return AsyncICalendarBuild(key, chunks, lock)
+
+
+def get_icalendar_cache_stats() -> dict[str, int]:
+    """Returns the hit and miss counts of the iCalendar cache."""
+    counts = cache.get_many([ICALENDAR_CACHE_HITS_KEY, ICALENDAR_CACHE_MISSES_KEY])
+    return {
+        "hits": counts.get(ICALENDAR_CACHE_HITS_KEY, 0),
+        "misses": counts.get(ICALENDAR_CACHE_MISSES_KEY, 0),
+    }
+
+
+def reset_icalendar_cache_stats() -> None:
+    """Resets the hit and miss counts of the iCalendar cache."""
+    cache.delete_many([ICALENDAR_CACHE_HITS_KEY, ICALENDAR_CACHE_MISSES_KEY])
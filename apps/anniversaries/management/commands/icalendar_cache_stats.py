@@ -0,0 +1,31 @@
+"""Register 'anniversaries' actions with 'manage.py'."""
+
+from anniversaries.cache import get_icalendar_cache_stats, reset_icalendar_cache_stats
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+class Command(BaseCommand):
+    """Command to show the hit and miss counts of the iCalendar cache."""
+
+    help: str = "Show iCalendar cache statistics"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counts afterwards."
+        )
+
+    def handle(self, *args: str, **kwargs: bool) -> None:
+        """Writes the hit and miss counts of the iCalendar cache."""
+        del args
+        try:
+            stats = get_icalendar_cache_stats()
+            lookups = stats["hits"] + stats["misses"]
+            ratio = stats["hits"] / lookups if lookups else 0
+            self.stdout.write(f"Hits: {stats['hits']}")
+            self.stdout.write(f"Misses: {stats['misses']}")
+            self.stdout.write(f"Hit ratio: {ratio:.1%}")
+            if kwargs["reset"]:
+                reset_icalendar_cache_stats()
+                self.stdout.write(self.style.SUCCESS("Successfully reset counts"))
+        except Exception as error:
+            raise CommandError(error) from error
@@ -0,0 +1,26 @@
+"""Register 'anniversaries' actions with 'manage.py'."""
+
+from typing import Any
+
+from anniversaries.models import CalendarMembership
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    """Command to rebuild the denormalized calendar memberships from families,
+    in case they got out of sync (raw SQL, bulk operations without signals)."""
+
+    help: str = "Rebuild calendar memberships"
+
+    def handle(self, *args: str, **kwargs: Any) -> None:
+        """Recomputes every calendar membership in a single transaction."""
+        del args, kwargs
+        try:
+            with transaction.atomic():
+                count = CalendarMembership.objects.rebuild()
+        except Exception as error:
+            raise CommandError(error) from error
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt {count} calendar membership(s)")
+        )
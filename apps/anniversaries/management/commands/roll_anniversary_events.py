@@ -0,0 +1,31 @@
+"""Register 'anniversaries' actions with 'manage.py'."""
+
+from typing import Any
+
+from anniversaries.models import AnniversaryEvent
+from anniversaries.models.events import get_event_horizon
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Command to move the horizon of materialized events to the current date,
+    to be run nightly."""
+
+    help: str = "Roll anniversary events forward"
+
+    def handle(self, *args: str, **kwargs: Any) -> None:
+        """Deletes the events out of the horizon and creates the missing ones."""
+        del args, kwargs
+        start_date, end_date = get_event_horizon()
+        try:
+            deleted, created = AnniversaryEvent.objects.roll_horizon(
+                start_date=start_date, end_date=end_date
+            )
+        except Exception as error:
+            raise CommandError(error) from error
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully rolled events to {start_date} - {end_date}: "
+                f"{deleted} deleted, {created} created"
+            )
+        )
@@ -1,73 +1,313 @@
 """Register 'anniversaries' actions with 'manage.py'."""
 
 import logging
+import smtplib
+import zlib
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 from datetime import date
+from queue import Empty, Full, Queue
+from time import perf_counter
+from typing import Any, Iterator, NamedTuple
 
 from accounts.models import User
-from anniversaries.models import Calendar, Person
+from anniversaries.models import Calendar, Person, ReminderLog
+from anniversaries.models.persons import EVENT_KIND_BIRTHDAY, PersonQuerySet
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
 from django.core.management.base import BaseCommand, CommandError, CommandParser
-from django.db.models import QuerySet
+from django.db import connection as db_connection
 from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
 
 DAYS_AHEAD: int = 7  # one week
+BATCH_SIZE: int = 50  # messages sent per SMTP session
+WORKERS: int = 1
+DRY_RUN_EMAIL_BACKEND: str = "django.core.mail.backends.dummy.EmailBackend"
+LOCK_ID: int = zlib.crc32(b"anniversaries.send_event_reminders")
 
 logger = logging.getLogger(__name__)
 
 
-def send_email(*, days: int = DAYS_AHEAD) -> None:
-    """Send email"""
+class Reminder(NamedTuple):
+    """An event reminder, computed but not rendered yet."""
+
+    recipient: str
+    subject: str
+    context: dict[str, Any]
+    logs: list[ReminderLog]
+
+
+class ReminderStats:
+    """Counts of sent and failed messages, and time spent in each stage."""
+
+    STAGES: list[str] = ["compute", "render", "send"]
+
+    def __init__(self) -> None:
+        self.sent: int = 0
+        self.failed: int = 0
+        self.durations: dict[str, float] = dict.fromkeys(self.STAGES, 0.0)
+
+    def __iadd__(self, other: "ReminderStats") -> "ReminderStats":
+        self.sent += other.sent
+        self.failed += other.failed
+        for stage, duration in other.durations.items():
+            self.durations[stage] += duration
+        return self
+
+
+def get_subject(days: int, calendars: list[Calendar]) -> str:
+    """Returns the subject of an event reminder."""
+    return " ".join(
+        [
+            f"[{settings.CUSTOM_SITE_NAME}]",  # type: ignore
+            "🎂",
+            _("Birthdays in the next %(days)s days") % {"days": days},
+            "(" + ", ".join(str(calendar) for calendar in calendars) + ")",
+        ]
+    )
+
+
+@contextmanager
+def advisory_lock(lock_id: int) -> Iterator[bool]:
+    """Holds a PostgreSQL session advisory lock, if no other session holds it,
+    while the context is active. Yields whether the lock has been acquired."""
+    with db_connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [lock_id])
+        is_acquired: bool = cursor.fetchone()[0]
+    try:
+        yield is_acquired
+    finally:
+        if is_acquired:
+            with db_connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [lock_id])
+
+
+def get_reminders(
+    *, days: int = DAYS_AHEAD, digest: bool = False
+) -> Iterator[Reminder]:
+    """Yields the event reminders of active users, one per calendar or, in digest
+    mode, one per user gathering the events of all their calendars.
+
+    Events already sent to a user by previous runs, according to the reminder
+    logs, are left out and reminders without any new event are skipped, so that
+    running the command again sends nothing new."""
     current_site = Site.objects.get_current()
 
+    already_sent: defaultdict[int, set[tuple[Any, date]]] = defaultdict(set)
+    for user_id, person_id, event_date in ReminderLog.objects.filter(
+        kind=EVENT_KIND_BIRTHDAY, event_date__gt=date.today()
+    ).values_list("user_id", "person_id", "event_date"):
+        already_sent[user_id].add((person_id, event_date))
+
     for user in User.objects.filter(is_active=True):
-        events: list[tuple[Person, int, date]] = []
-        calendars: QuerySet[Calendar] = user.anniversaries_calendars_as_owner.all()
-        for calendar in calendars:
+        calendars: list[Calendar] = list(user.anniversaries_calendars_as_owner.all())
+        if not calendars:
+            continue
+
+        groups: list[tuple[list[Calendar], PersonQuerySet]]
+        if digest:
+            # People shared between calendars only appear once:
+            people = Person.objects.filter(
+                anniversaries_calendar_membership__calendar__in=calendars
+            ).distinct()
+            groups = [(calendars, people)]
+        else:
+            groups = [([calendar], calendar.people()) for calendar in calendars]
+
+        for group_calendars, people in groups:
+            events = [
+                (person, age, event_date)
+                for person, age, event_date in people.get_next_birthday_list(days)
+                if (person.pk, event_date) not in already_sent[user.pk]
+            ]
+            if not events:
+                continue
             logger.info(
-                'Send email to "%s" with event reminders linked to the calendar "%s" '
-                "for the next %s day(s).",
+                'Prepare email to "%s" with event reminders linked to the '
+                'calendar(s) "%s" for the next %s day(s).',
                 user,
-                calendar,
+                '", "'.join(str(calendar) for calendar in group_calendars),
                 days,
             )
-            events += calendar.get_next_birthday_list(days=days)
-
-            subject: str = " ".join(
-                [
-                    f"[{settings.CUSTOM_SITE_NAME}]",  # type: ignore
-                    "🎂",
-                    _("Birthdays in the next %(days)s days") % {"days": days},
-                    f"({calendar})",
-                ]
+            yield Reminder(
+                recipient=user.email,
+                subject=get_subject(days, group_calendars),
+                context={
+                    "calendars": group_calendars,
+                    "events": events,
+                    "days": days,
+                    "site": current_site,
+                },
+                logs=[
+                    ReminderLog(
+                        user=user,
+                        person=person,
+                        event_date=event_date,
+                        kind=EVENT_KIND_BIRTHDAY,
+                    )
+                    for person, _age, event_date in events
+                ],
             )
 
-            send_mail(
-                from_email=None,
-                subject=subject,
-                message=render_to_string(
-                    "anniversaries/event_reminders.txt",
-                    {
-                        "calendar": calendar,
-                        "events": events,
-                        "days": days,
-                        "site": current_site,
-                    },
-                ).strip(),
-                recipient_list=[user.email],
-                fail_silently=True,
-                html_message=render_to_string(
-                    "anniversaries/event_reminders.html",
-                    {
-                        "calendar": calendar,
-                        "events": events,
-                        "days": days,
-                        "site": current_site,
-                    },
-                ).strip(),
-            )
+
+def render_reminder(reminder: Reminder) -> EmailMultiAlternatives:
+    """Renders the message of an event reminder."""
+    message = EmailMultiAlternatives(
+        subject=reminder.subject,
+        body=render_to_string(
+            "anniversaries/event_reminders.txt", reminder.context
+        ).strip(),
+        to=[reminder.recipient],
+    )
+    message.attach_alternative(
+        render_to_string(
+            "anniversaries/event_reminders.html", reminder.context
+        ).strip(),
+        "text/html",
+    )
+    return message
+
+
+def send_message(connection: BaseEmailBackend, message: EmailMessage) -> bool:
+    """Sends a message with an open connection, reconnects once if the server
+    dropped the session. Returns whether the message has been sent."""
+    try:
+        return bool(connection.send_messages([message]))
+    except smtplib.SMTPServerDisconnected:
+        logger.warning("The SMTP server dropped the session, reconnecting.")
+        connection.close()
+        connection.open()
+        return bool(connection.send_messages([message]))
+
+
+def run_worker(
+    reminders: "Queue[Reminder | None]",
+    sent_reminders: "Queue[Reminder]",
+    *,
+    batch_size: int = BATCH_SIZE,
+    backend: str | None = None,
+) -> ReminderStats:
+    """Renders and sends reminders from the queue until it yields None, reusing
+    a single connection per batch of messages, and hands sent reminders back
+    through the second queue. Returns the counts of sent and failed messages,
+    and the time spent in each stage."""
+    stats = ReminderStats()
+    connection = get_connection(backend, fail_silently=False)
+    batch_count: int = 0
+    try:
+        while (reminder := reminders.get()) is not None:
+            started = perf_counter()
+            message = render_reminder(reminder)
+            stats.durations["render"] += perf_counter() - started
+
+            started = perf_counter()
+            try:
+                if not batch_count:
+                    connection.open()
+                is_sent = send_message(connection, message)
+            except (smtplib.SMTPException, OSError):
+                logger.exception("Failed to send email to %s.", message.to)
+                is_sent = False
+                # The next message starts a new session:
+                with suppress(smtplib.SMTPException, OSError):
+                    connection.close()
+                batch_count = 0
+            else:
+                batch_count += 1
+            if is_sent:
+                stats.sent += 1
+                sent_reminders.put(reminder)
+            else:
+                stats.failed += 1
+            if batch_count >= batch_size:
+                connection.close()
+                batch_count = 0
+            stats.durations["send"] += perf_counter() - started
+    finally:
+        connection.close()
+    return stats
+
+
+def put_reminder(
+    reminders: "Queue[Reminder | None]",
+    reminder: Reminder | None,
+    workers: list[Future[ReminderStats]],
+) -> None:
+    """Puts a reminder in the queue, waiting while it is full. Raises the error
+    of a worker that stopped unexpectedly rather than waiting forever."""
+    while True:
+        try:
+            reminders.put(reminder, timeout=1)
+            return
+        except Full:
+            for worker in workers:
+                if worker.done():
+                    worker.result()
+
+
+def log_reminders(sent_reminders: "Queue[Reminder]") -> None:
+    """Saves the logs of the reminders sent so far, so that later runs skip
+    them. Database access stays in the current thread."""
+    logs: list[ReminderLog] = []
+    while True:
+        try:
+            logs += sent_reminders.get_nowait().logs
+        except Empty:
+            break
+    ReminderLog.objects.bulk_create(logs, ignore_conflicts=True)
+
+
+def send_email(
+    *,
+    days: int = DAYS_AHEAD,
+    batch_size: int = BATCH_SIZE,
+    workers: int = WORKERS,
+    backend: str | None = None,
+    digest: bool = False,
+    dry_run: bool = False,
+) -> ReminderStats:
+    """Send email
+
+    Reminders are computed in the current thread and handed over through a
+    bounded queue to a pool of threads rendering and sending them. Sent
+    reminders are logged as they come back, unless it is a dry run."""
+    stats = ReminderStats()
+    reminders: "Queue[Reminder | None]" = Queue(maxsize=2 * workers)
+    sent_reminders: "Queue[Reminder]" = Queue()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    run_worker,
+                    reminders,
+                    sent_reminders,
+                    batch_size=batch_size,
+                    backend=DRY_RUN_EMAIL_BACKEND if dry_run else backend,
+                )
+                for _ in range(workers)
+            ]
+            try:
+                started = perf_counter()
+                for reminder in get_reminders(days=days, digest=digest):
+                    stats.durations["compute"] += perf_counter() - started
+                    put_reminder(reminders, reminder, futures)
+                    if not dry_run:
+                        log_reminders(sent_reminders)
+                    started = perf_counter()
+            finally:
+                for _ in futures:
+                    put_reminder(reminders, None, futures)
+            for future in futures:
+                stats += future.result()
+    finally:
+        # Once every worker has stopped, even after an error:
+        if not dry_run:
+            log_reminders(sent_reminders)
+    return stats
 
 
 class Command(BaseCommand):
@@ -77,12 +317,71 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--days", nargs="?", type=int, default=DAYS_AHEAD)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of messages sent per SMTP session.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help="Number of threads rendering and sending messages.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Render messages without sending them and time each stage.",
+        )
+        parser.add_argument(
+            "--digest",
+            action="store_true",
+            help="Send a single message per user for all their calendars.",
+        )
 
-    def handle(self, *args: str, **kwargs: int) -> None:
-        """Updates or creates the default site configuration and superuser."""
+    def handle(self, *args: str, **kwargs: Any) -> None:
+        """Sends event reminders and reports how many were sent or failed."""
         del args
-        try:
-            send_email(days=kwargs["days"])
-            self.stdout.write(self.style.SUCCESS("Successfully sent event reminders"))
-        except Exception as error:
-            raise CommandError(error) from error
+        if kwargs["batch_size"] < 1:
+            raise CommandError("The batch size must be at least 1.")
+        if kwargs["workers"] < 1:
+            raise CommandError("The number of workers must be at least 1.")
+        started = perf_counter()
+        with advisory_lock(LOCK_ID) as is_acquired:
+            if not is_acquired:
+                self.stdout.write(
+                    self.style.WARNING("Event reminders are already being sent")
+                )
+                return
+            try:
+                stats = send_email(
+                    days=kwargs["days"],
+                    batch_size=kwargs["batch_size"],
+                    workers=kwargs["workers"],
+                    digest=kwargs["digest"],
+                    dry_run=kwargs["dry_run"],
+                )
+            except Exception as error:
+                raise CommandError(error) from error
+        duration = perf_counter() - started
+
+        if kwargs["dry_run"]:
+            count = stats.sent + stats.failed
+            self.stdout.write(
+                f"Processed {count} event reminder(s) in {duration:.3f}s "
+                f"({count / duration:.1f}/s) with {kwargs['workers']} worker(s)"
+            )
+            for stage, stage_duration in stats.durations.items():
+                self.stdout.write(f"{stage}: {stage_duration:.3f}s")
+        elif stats.failed:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Sent {stats.sent} event reminder(s), "
+                    f"failed to send {stats.failed}"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Successfully sent {stats.sent} event reminder(s)")
+            )
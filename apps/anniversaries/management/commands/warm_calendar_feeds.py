@@ -0,0 +1,160 @@
+"""Register 'anniversaries' actions with 'manage.py'."""
+
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+from time import perf_counter
+from typing import Any, Iterator
+from uuid import UUID
+
+import django
+from anniversaries.cache import get_icalendar_key, set_cached_icalendar
+from anniversaries.models import Calendar
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+from django.utils import translation
+
+WORKERS: int = os.cpu_count() or 1
+
+logger = logging.getLogger(__name__)
+
+
+def is_cache_shared() -> bool:
+    """Returns whether the default cache is shared with other processes, such as
+    the ones serving calendar feeds, rather than local to the current one."""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def get_calendar_ids(today_only: bool) -> list[UUID]:
+    """Returns the primary keys of the calendars to warm up, only those with
+    people having a birthday or a death anniversary today if required, according
+    to their memberships and materialized events, like feeds."""
+    calendars = Calendar.objects.all()
+    if today_only:
+        calendars = calendars.filter(
+            anniversaries_membership__person__anniversaries_event__date=date.today()
+        ).distinct()
+    return list(calendars.values_list("pk", flat=True))
+
+
+def init_worker() -> None:
+    """Sets up Django in a worker process, which opens its own database
+    connection."""
+    django.setup()
+
+
+def build_icalendar(calendar_id: UUID, language: str) -> bytes:
+    """Builds the iCalendar of a calendar, in a worker process."""
+    with translation.override(language):
+        calendar = Calendar.objects.get(pk=calendar_id)
+        return b"".join(calendar.iter_icalendar())
+
+
+def iter_icalendars(
+    calendar_ids: list[UUID], language: str, workers: int
+) -> Iterator[tuple[UUID, bytes | None]]:
+    """Yields the iCalendar of each calendar, or None if it could not be built,
+    built by a pool of worker processes."""
+    if workers == 1:
+        for calendar_id in calendar_ids:
+            try:
+                yield calendar_id, build_icalendar(calendar_id, language)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception('Failed to build calendar "%s".', calendar_id)
+                yield calendar_id, None
+        return
+
+    # Workers must not share the connection of the parent process:
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures: dict[UUID, Future[bytes]] = {
+            calendar_id: pool.submit(build_icalendar, calendar_id, language)
+            for calendar_id in calendar_ids
+        }
+        for calendar_id, future in futures.items():
+            try:
+                yield calendar_id, future.result()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception('Failed to build calendar "%s".', calendar_id)
+                yield calendar_id, None
+
+
+def warm_calendar_feeds(today_only: bool, workers: int) -> tuple[int, int, int]:
+    """Builds and caches the iCalendar of calendars, returns the numbers of
+    calendars warmed up and failed, and the number of bytes cached.
+
+    Only feeds in the default language are warmed up: without a locale
+    middleware, it is the only language feeds are served in."""
+    language = settings.LANGUAGE_CODE
+    with translation.override(language):
+        # Keys are computed before building, see 'set_cached_icalendar':
+        keys = {
+            calendar_id: get_icalendar_key(calendar_id)
+            for calendar_id in get_calendar_ids(today_only)
+        }
+        warmed, failed, size = 0, 0, 0
+        for calendar_id, icalendar in iter_icalendars(list(keys), language, workers):
+            if icalendar is None:
+                failed += 1
+                continue
+            set_cached_icalendar(keys[calendar_id], icalendar)
+            warmed += 1
+            size += len(icalendar)
+    return warmed, failed, size
+
+
+class Command(BaseCommand):
+    """Command to build and cache calendar feeds before clients poll them.
+
+    Feeds are cached in the default cache, which must be shared by all
+    processes (Redis, Memcached, etc.): with a local memory cache, they would be
+    lost when the command exits. They are built in the default language
+    ('LANGUAGE_CODE'), the one calendar feeds are served in."""
+
+    help: str = "Warm up calendar feeds in the default cache, shared by all processes"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help="Number of processes building feeds.",
+        )
+        parser.add_argument(
+            "--today-only",
+            action="store_true",
+            help="Only warm up calendars with events today.",
+        )
+
+    def handle(self, *args: str, **kwargs: Any) -> None:
+        """Builds and caches calendar feeds and reports the throughput."""
+        del args
+        if not is_cache_shared():
+            raise CommandError(
+                "The default cache is local to this process, warmed feeds would be "
+                "lost: configure a cache backend shared by all processes."
+            )
+        started = perf_counter()
+        try:
+            warmed, failed, size = warm_calendar_feeds(
+                today_only=kwargs["today_only"], workers=max(kwargs["workers"], 1)
+            )
+        except Exception as error:
+            raise CommandError(error) from error
+        duration = perf_counter() - started
+
+        self.stdout.write(
+            f"Built {warmed} feed(s) ({size / 1024:.1f} KiB) in {duration:.3f}s "
+            f"({warmed / duration:.1f}/s) with {kwargs['workers']} worker(s)"
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(f"Failed to build {failed} feed(s)"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Successfully warmed {warmed} feed(s)")
+            )
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.12 on 2026-10-18 16:41
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anniversaries", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendar",
+            name="years_behind",
+            field=models.PositiveSmallIntegerField(
+                default=1,
+                help_text="How many years into the past should we display events?",
+                validators=[django.core.validators.MaxValueValidator(10)],
+                verbose_name="years behind",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.12 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anniversaries", "0002_calendar_years_behind"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendar",
+            name="use_recurring_events",
+            field=models.BooleanField(
+                default=False,
+                help_text="Should we display one yearly event per anniversary?",
+                verbose_name="use recurring events?",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.12 on 2026-10-18 16:48
+
+import django.db.models.expressions
+import django.db.models.functions.datetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anniversaries", "0003_calendar_use_recurring_events"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                django.db.models.expressions.CombinedExpression(
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.functions.datetime.ExtractMonth(
+                            "date_of_birth"
+                        ),
+                        "*",
+                        models.Value(100),
+                    ),
+                    "+",
+                    django.db.models.functions.datetime.ExtractDay("date_of_birth"),
+                ),
+                name="person_birthday_month_day_idx",
+            ),
+        ),
+    ]
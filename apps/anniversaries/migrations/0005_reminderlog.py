@@ -0,0 +1,74 @@
+# Generated by Django 5.0.12 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anniversaries", "0004_person_person_birthday_month_day_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReminderLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_date", models.DateField(verbose_name="event date")),
+                (
+                    "kind",
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, "🎂 birthday"), (2, "🪦 death anniversary")],
+                        default=1,
+                        verbose_name="kind",
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="sent at"),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(app_label)s_reminder_logs",
+                        related_query_name="%(app_label)s_reminder_log",
+                        to="anniversaries.person",
+                        verbose_name="person",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(app_label)s_reminder_logs",
+                        related_query_name="%(app_label)s_reminder_log",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "reminder log",
+                "verbose_name_plural": "reminder logs",
+                "ordering": ["-sent_at"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="reminderlog",
+            constraint=models.UniqueConstraint(
+                fields=("user", "person", "event_date", "kind"),
+                name="reminder_log_unique_event",
+            ),
+        ),
+    ]
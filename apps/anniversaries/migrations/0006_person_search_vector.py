@@ -0,0 +1,85 @@
+# Generated by Django 5.0.12 on 2026-10-18 17:02
+
+import operator
+import re
+import unicodedata
+from functools import reduce
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+# Frozen copies of the search settings of 'Person' at the time of this migration:
+SEARCH_CONFIG = "simple"
+SEARCH_FIELDS = {
+    "nickname": "A",
+    "first_name": "A",
+    "preferred_name": "A",
+    "birth_name": "B",
+    "married_name": "B",
+    "middle_names": "C",
+}
+
+
+def get_search_words(text):
+    """Returns the words of a text in lowercase and without accents."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r"[^\W_]+", text)
+
+
+def fill_search_vector(apps, schema_editor):
+    """Computes the search vector of existing people, like 'Person.save'."""
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import Value
+
+    Person = apps.get_model("anniversaries", "Person")
+    batch = []
+    people = Person.objects.only(*SEARCH_FIELDS)
+    for person in people.iterator(chunk_size=BATCH_SIZE):
+        words: dict[str, list[str]] = {}
+        for field, weight in SEARCH_FIELDS.items():
+            value = getattr(person, field) or ""
+            words.setdefault(weight, []).extend(
+                get_search_words(" ".join(value) if isinstance(value, list) else value)
+            )
+        person.search_vector = reduce(
+            operator.add,
+            [
+                SearchVector(
+                    Value(" ".join(weight_words)), config=SEARCH_CONFIG, weight=weight
+                )
+                for weight, weight_words in words.items()
+            ],
+        )
+        batch.append(person)
+        if len(batch) >= BATCH_SIZE:
+            Person.objects.bulk_update(batch, ["search_vector"])
+            batch = []
+    Person.objects.bulk_update(batch, ["search_vector"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anniversaries", "0005_reminderlog"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="person",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="person",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="person_search_vector_idx"
+            ),
+        ),
+    ]
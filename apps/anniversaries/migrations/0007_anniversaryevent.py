@@ -0,0 +1,145 @@
+# Generated by Django 5.0.12 on 2026-10-18 17:35
+
+from datetime import date
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+# Frozen copies of the event settings at the time of this migration:
+YEARS_AHEAD_MAX = 10
+YEARS_BEHIND_MAX = 10
+EVENT_KIND_BIRTHDAY = 1
+EVENT_KIND_DEATH_ANNIVERSARY = 2
+
+
+def iter_anniversaries(event_date, start_date, end_date):
+    """Yields '(ordinal, date)' tuples for an event and its anniversaries between
+    'start_date' and 'end_date', February 29 being celebrated on March 1 during
+    common years."""
+    for year in range(max(event_date.year, start_date.year), end_date.year + 1):
+        try:
+            anniversary = event_date.replace(year=year)
+        except ValueError:
+            anniversary = event_date.replace(year=year, month=3, day=1)
+        if start_date <= anniversary <= end_date:
+            yield year - event_date.year, anniversary
+
+
+def fill_events(apps, schema_editor):
+    """Materializes the events of existing people, like 'Person.save'."""
+    Person = apps.get_model("anniversaries", "Person")
+    AnniversaryEvent = apps.get_model("anniversaries", "AnniversaryEvent")
+    today = date.today()
+    start_date = date(year=today.year - YEARS_BEHIND_MAX, month=1, day=1)
+    end_date = date(year=today.year + YEARS_AHEAD_MAX, month=12, day=31)
+    events = []
+    people = Person.objects.only("id", "date_of_birth", "date_of_death")
+    for person in people.iterator(chunk_size=BATCH_SIZE):
+        if person.date_of_birth:
+            for ordinal, event_date in iter_anniversaries(
+                person.date_of_birth,
+                start_date,
+                min(person.date_of_death or end_date, end_date),
+            ):
+                events.append(
+                    AnniversaryEvent(
+                        person=person,
+                        kind=EVENT_KIND_BIRTHDAY,
+                        ordinal=ordinal,
+                        date=event_date,
+                    )
+                )
+        if person.date_of_death:
+            for ordinal, event_date in iter_anniversaries(
+                person.date_of_death, start_date, end_date
+            ):
+                events.append(
+                    AnniversaryEvent(
+                        person=person,
+                        kind=EVENT_KIND_DEATH_ANNIVERSARY,
+                        ordinal=ordinal,
+                        date=event_date,
+                    )
+                )
+        if len(events) >= BATCH_SIZE:
+            AnniversaryEvent.objects.bulk_create(events)
+            events = []
+    AnniversaryEvent.objects.bulk_create(events)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anniversaries", "0006_person_search_vector"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="calendar",
+            name="years_ahead",
+            field=models.PositiveSmallIntegerField(
+                default=3,
+                help_text="How many years into the future should we display birthdays?",
+                validators=[django.core.validators.MaxValueValidator(10)],
+                verbose_name="years ahead",
+            ),
+        ),
+        migrations.CreateModel(
+            name="AnniversaryEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, "🎂 birthday"), (2, "🪦 death anniversary")],
+                        verbose_name="kind",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="date")),
+                (
+                    "ordinal",
+                    models.PositiveSmallIntegerField(
+                        help_text="Years since the event, 0 for the event itself.",
+                        verbose_name="ordinal",
+                    ),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(app_label)s_events",
+                        related_query_name="%(app_label)s_event",
+                        to="anniversaries.person",
+                        verbose_name="person",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "anniversary event",
+                "verbose_name_plural": "anniversary events",
+                "ordering": ["date"],
+                "indexes": [
+                    models.Index(
+                        fields=["date", "kind"], name="anniversary_event_date_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="anniversaryevent",
+            constraint=models.UniqueConstraint(
+                fields=("person", "kind", "ordinal"),
+                name="anniversary_event_unique_ordinal",
+            ),
+        ),
+        migrations.RunPython(fill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.0.12 on 2026-10-18 17:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_memberships(apps, schema_editor):
+    """Denormalizes the people of existing calendars, like the signals do."""
+    Person = apps.get_model("anniversaries", "Person")
+    CalendarMembership = apps.get_model("anniversaries", "CalendarMembership")
+    pairs = (
+        Person.families.through.objects.filter(
+            family__anniversaries_calendar__isnull=False
+        )
+        .values_list("family__anniversaries_calendar", "person")
+        .distinct()
+    )
+    CalendarMembership.objects.bulk_create(
+        [
+            CalendarMembership(calendar_id=calendar_id, person_id=person_id)
+            for calendar_id, person_id in pairs
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anniversaries", "0007_anniversaryevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CalendarMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "calendar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(app_label)s_memberships",
+                        related_query_name="%(app_label)s_membership",
+                        to="anniversaries.calendar",
+                        verbose_name="calendar",
+                    ),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(app_label)s_calendar_memberships",
+                        related_query_name="%(app_label)s_calendar_membership",
+                        to="anniversaries.person",
+                        verbose_name="person",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "calendar membership",
+                "verbose_name_plural": "calendar memberships",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="calendarmembership",
+            constraint=models.UniqueConstraint(
+                fields=("calendar", "person"), name="calendar_membership_unique_person"
+            ),
+        ),
+        migrations.RunPython(fill_memberships, migrations.RunPython.noop),
+    ]
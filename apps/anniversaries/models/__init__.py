@@ -1,11 +1,17 @@
 """Model definitions for the 'anniversaries' application."""
 
 from .calendars import Calendar
+from .events import AnniversaryEvent
 from .families import Family
+from .memberships import CalendarMembership
 from .persons import Person
+from .reminders import ReminderLog
 
 __all__ = [
+    "AnniversaryEvent",
     "Calendar",
+    "CalendarMembership",
     "Family",
     "Person",
+    "ReminderLog",
 ]
@@ -1,23 +1,121 @@
 """Model definitions for the 'anniversaries' application."""
 
+import hashlib
 import logging
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time
+from typing import Any, AsyncIterator, Iterable, Iterator
 from uuid import uuid4
 
-from anniversaries.utils import get_icalendar
+from anniversaries.cache import (
+    UPCOMING_BIRTHDAYS_CACHE_TIMEOUT,
+    get_cached_icalendar_or_lock,
+    get_icalendar_key,
+    get_upcoming_birthdays_key,
+    iter_and_cache_icalendar,
+)
+from anniversaries.utils import get_icalendar_envelope
+from asgiref.sync import sync_to_async
 from core.models.mixins import SensitiveMixin
+from django.contrib.postgres.aggregates import StringAgg
+from django.core.cache import cache
+from django.core.validators import MaxValueValidator
 from django.db import models
+from django.db.models import Count, Max, OuterRef, Prefetch, Subquery
+from django.db.models.functions import MD5, Cast
 from django.urls import reverse
 from django.utils.text import slugify
+from django.utils.timezone import make_aware
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
+from toolbox import __version__
+
+from .events import YEARS_AHEAD_MAX, YEARS_BEHIND_MAX, AnniversaryEvent
 from .families import Family
-from .persons import Person
+from .persons import (
+    EVENT_KIND_BIRTHDAY,
+    EVENT_KIND_DEATH_ANNIVERSARY,
+    Person,
+    PersonQuerySet,
+)
 
 YEARS_AHEAD: int = 3
+YEARS_BEHIND: int = 1
+PEOPLE_CHUNK_SIZE: int = 200
 logger = logging.getLogger(__name__)
 
 
+def get_icalendar_validator_aggregates() -> dict[str, Any]:
+    """Returns the aggregates of a calendar the iCalendar validators depend on.
+    Families and people are aggregated in separate subqueries, so that their
+    rows are not multiplied together, and people are identified by a digest of
+    their primary keys, so that swapping members changes the validators."""
+    families = (
+        Family.objects.filter(anniversaries_calendar=OuterRef("pk"))
+        .order_by()
+        .values("anniversaries_calendar")
+    )
+    people = (
+        Person.objects.filter(
+            anniversaries_calendar_membership__calendar=OuterRef("pk")
+        )
+        .order_by()
+        .values("anniversaries_calendar_membership__calendar")
+    )
+    return {
+        "calendar_changed_at": Max("changed_at"),
+        "families_changed_at": Max(
+            Subquery(families.annotate(value=Max("changed_at")).values("value"))
+        ),
+        "people_changed_at": Max(
+            Subquery(people.annotate(value=Max("changed_at")).values("value"))
+        ),
+        "people_count": Max(
+            Subquery(people.annotate(value=Count("pk")).values("value"))
+        ),
+        "people_digest": Max(
+            Subquery(
+                people.annotate(
+                    value=MD5(
+                        StringAgg(Cast("pk", models.TextField()), ",", ordering="pk")
+                    )
+                ).values("value")
+            )
+        ),
+    }
+
+
+def get_icalendar_validators(aggregates: dict[str, Any]) -> tuple[str, datetime]:
+    """Returns an entity tag and a last modification date for an iCalendar, from
+    the aggregates of its calendar."""
+    today = date.today()
+    # Ages in event summaries change with the date:
+    last_modified = max(
+        changed_at
+        for changed_at in [
+            make_aware(datetime.combine(today, time.min)),
+            aggregates["calendar_changed_at"],
+            aggregates["families_changed_at"],
+            aggregates["people_changed_at"],
+        ]
+        if changed_at
+    )
+    etag = hashlib.md5(
+        ":".join(
+            [
+                __version__,
+                str(get_language()),
+                today.isoformat(),
+                last_modified.isoformat(),
+                str(aggregates["people_count"]),
+                str(aggregates["people_digest"]),
+            ]
+        ).encode("utf-8"),
+        usedforsecurity=False,
+    ).hexdigest()
+    return etag, last_modified
+
+
 class Calendar(SensitiveMixin, models.Model):
     """Class to generate a calendar with people anniversaries."""
 
@@ -44,10 +142,24 @@ class Calendar(SensitiveMixin, models.Model):
 
     years_ahead = models.PositiveSmallIntegerField(
         default=YEARS_AHEAD,
+        validators=[MaxValueValidator(YEARS_AHEAD_MAX)],
         verbose_name=_("years ahead"),
         help_text=_("How many years into the future should we display birthdays?"),
     )
 
+    years_behind = models.PositiveSmallIntegerField(
+        default=YEARS_BEHIND,
+        validators=[MaxValueValidator(YEARS_BEHIND_MAX)],
+        verbose_name=_("years behind"),
+        help_text=_("How many years into the past should we display events?"),
+    )
+
+    use_recurring_events = models.BooleanField(
+        default=False,
+        verbose_name=_("use recurring events?"),
+        help_text=_("Should we display one yearly event per anniversary?"),
+    )
+
     families = models.ManyToManyField(  # type: ignore
         to=Family,
         related_name="%(app_label)s_calendars",
@@ -70,9 +182,10 @@ class Calendar(SensitiveMixin, models.Model):
         """Returns a description of the model (for customers)."""
         return " ".join([self.icon, self.title])
 
-    def people(self) -> models.QuerySet[Person]:
-        """Returns a queryset with people related to an instance of the model."""
-        return Person.objects.filter(families__in=self.families.all()).distinct()
+    def people(self) -> PersonQuerySet:
+        """Returns a queryset with people related to an instance of the model,
+        looked up in their denormalized memberships."""
+        return Person.objects.filter(anniversaries_calendar_membership__calendar=self)
 
     def get_absolute_url(self) -> str:
         """Calculates the canonical URL for an instance of the model."""
@@ -82,37 +195,156 @@ class Calendar(SensitiveMixin, models.Model):
             kwargs={"calendar_id": self.pk, "filename": filename},
         )
 
-    def get_icalendar(self) -> bytes:
-        """Builds the iCalendar."""
-        ical = get_icalendar(title=str(self))
+    def get_date_range(self) -> tuple[date, date]:
+        """Returns the first and last dates of the events displayed in the
+        calendar."""
         now = datetime.now()
+        years_behind = min(self.years_behind, YEARS_BEHIND_MAX)
+        years_ahead = min(self.years_ahead, YEARS_AHEAD_MAX)
+        # The beginning of the year a few years ago:
+        start_date = date(year=now.year - years_behind, month=1, day=1)
         # The end of the year in a few years:
-        end_date = date(year=now.year + self.years_ahead, month=12, day=31)
+        end_date = date(year=now.year + years_ahead, month=12, day=31)
+        return start_date, end_date
+
+    def get_icalendar_validators(self) -> tuple[str, datetime]:
+        """Returns an entity tag and a last modification date for the iCalendar,
+        computed with a single query and without building the iCalendar."""
+        aggregates = Calendar.objects.filter(pk=self.pk).aggregate(
+            **get_icalendar_validator_aggregates()
+        )
+        return get_icalendar_validators(aggregates)
+
+    async def aget_icalendar_validators(self) -> tuple[str, datetime]:
+        """Async version of 'get_icalendar_validators'."""
+        aggregates = await Calendar.objects.filter(pk=self.pk).aaggregate(
+            **get_icalendar_validator_aggregates()
+        )
+        return get_icalendar_validators(aggregates)
 
-        for person in self.people():
-            for ievent in person.get_birthday_ievent_list(end_date=end_date):
-                ical.add_component(ievent)
+    def get_feed_people(self, start_date: date, end_date: date) -> PersonQuerySet:
+        """Returns the people of the calendar, with their materialized events
+        between 'start_date' and 'end_date' ('anniversary_events') unless events
+        are recurring."""
+        people = self.people()
+        if self.use_recurring_events:
+            return people
+        kinds = [EVENT_KIND_BIRTHDAY]
+        if not self.hide_death_anniversaries:
+            kinds.append(EVENT_KIND_DEATH_ANNIVERSARY)
+        return people.prefetch_related(
+            Prefetch(
+                "anniversaries_events",
+                queryset=AnniversaryEvent.objects.filter(
+                    kind__in=kinds, date__range=(start_date, end_date)
+                ).order_by("kind", "date"),
+                to_attr="anniversary_events",
+            )
+        )
 
+    def serialize_people(
+        self, people: Iterable[Person], start_date: date, end_date: date
+    ) -> bytes:
+        """Returns the serialized events of the given people, from their
+        materialized events if they have been fetched."""
+        chunks: list[bytes] = []
+        for person in people:
+            if self.use_recurring_events:
+                chunks.append(
+                    person.serialize_recurring_ievent_list(
+                        with_death_anniversary=not self.hide_death_anniversaries
+                    )
+                )
+                continue
+            if hasattr(person, "anniversary_events"):
+                chunks.append(
+                    person.serialize_event_ievent_list(
+                        person.anniversary_events  # type: ignore[attr-defined]
+                    )
+                )
+                continue
+            chunks.append(
+                person.serialize_birthday_ievent_list(
+                    start_date=start_date, end_date=end_date
+                )
+            )
             if not self.hide_death_anniversaries:
-                for ievent in person.get_death_anniversary_ievent_list(
-                    end_date=end_date
-                ):
-                    ical.add_component(ievent)
+                chunks.append(
+                    person.serialize_death_anniversary_ievent_list(
+                        start_date=start_date, end_date=end_date
+                    )
+                )
+        return b"".join(chunks)
+
+    def iter_icalendar(self) -> Iterator[bytes]:
+        """Builds the iCalendar chunk by chunk: the header, then the events of
+        each person, and finally the footer."""
+        header, footer = get_icalendar_envelope(title=str(self))
+        yield header
+
+        start_date, end_date = self.get_date_range()
+        people = self.get_feed_people(start_date, end_date)
+        for person in people.iterator(chunk_size=PEOPLE_CHUNK_SIZE):
+            if ievents := self.serialize_people([person], start_date, end_date):
+                yield ievents
+
+        yield footer
 
-        return ical.to_ical()
+    async def aiter_icalendar(self) -> AsyncIterator[bytes]:
+        """Async version of 'iter_icalendar', yielding the events of people chunk
+        by chunk. Events are serialized in a worker thread so that the event loop
+        keeps serving other requests meanwhile."""
+        header, footer = get_icalendar_envelope(title=str(self))
+        yield header
+
+        start_date, end_date = self.get_date_range()
+        serialize_people = sync_to_async(self.serialize_people, thread_sensitive=False)
+        people: list[Person] = []
+        feed_people = self.get_feed_people(start_date, end_date)
+        async for person in feed_people.aiterator(chunk_size=PEOPLE_CHUNK_SIZE):
+            people.append(person)
+            if len(people) < PEOPLE_CHUNK_SIZE:
+                continue
+            if ievents := await serialize_people(people, start_date, end_date):
+                yield ievents
+            people = []
+        if ievents := await serialize_people(people, start_date, end_date):
+            yield ievents
+
+        yield footer
+
+    def get_icalendar(self) -> bytes:
+        """Returns the iCalendar, from the cache if possible."""
+        key = get_icalendar_key(self.pk)
+        cached = get_cached_icalendar_or_lock(key, allow_stale=False)
+        if cached.content is not None:
+            return cached.content
+        return b"".join(
+            iter_and_cache_icalendar(key, self.iter_icalendar(), cached.lock)
+        )
 
     def get_next_birthday_list(self, days: int) -> list[tuple[Person, int, date]]:
-        """Returns the list of birthdays from today to "days" in the future."""
-        events: list[tuple[Person, int, date]] = []
-        today = date.today()
-        for person in self.people():
-            birthday_list = person.get_birthday_list(
-                end_date=today + timedelta(days=days)
+        """Returns the list of birthdays from today (excluded) to "days" in the
+        future, in chronological order."""
+        return self.people().get_next_birthday_list(days=days)
+
+    @classmethod
+    def get_owner_next_birthday_list(
+        cls, owner_id: int, days: int
+    ) -> list[tuple[Person, int, date]]:
+        """Returns the list of birthdays of the people in any calendar of an owner,
+        from today (excluded) to "days" in the future, in chronological order.
+
+        The list is cached for the day, until one of these calendars changes."""
+        key = get_upcoming_birthdays_key(owner_id, days)
+        birthdays: list[tuple[Person, int, date]] | None = cache.get(key)
+        if birthdays is None:
+            birthdays = (
+                Person.objects.filter(
+                    anniversaries_calendar_membership__calendar__created_by_id=owner_id
+                )
+                .distinct()
+                .get_next_birthday_list(days=days)
             )
-            next_birthday_list = [
-                (person, age, day)
-                for age, day in enumerate(birthday_list)
-                if day > today
-            ]
-            events += next_birthday_list
-        return events
+            cache.set(key, birthdays, timeout=UPCOMING_BIRTHDAYS_CACHE_TIMEOUT)
+        return birthdays
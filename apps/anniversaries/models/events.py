@@ -0,0 +1,140 @@
+"""Model definitions for the 'anniversaries' application."""
+
+from datetime import date
+from typing import Iterable
+
+from django.db import models
+from django.db.models import Max, Q
+from django.utils.translation import gettext_lazy as _
+
+from .persons import EVENT_KIND_CHOICES, Person
+
+YEARS_AHEAD_MAX: int = 10  # global cap, whatever the calendar settings
+YEARS_BEHIND_MAX: int = 10  # global cap, whatever the calendar settings
+BATCH_SIZE: int = 1000
+
+
+def get_event_horizon(today: date | None = None) -> tuple[date, date]:
+    """Returns the first and last dates of the events materialized in the
+    database, which include the events displayed by every calendar."""
+    today = today or date.today()
+    return (
+        date(year=today.year - YEARS_BEHIND_MAX, month=1, day=1),
+        date(year=today.year + YEARS_AHEAD_MAX, month=12, day=31),
+    )
+
+
+class AnniversaryEventQuerySet(models.QuerySet["AnniversaryEvent"]):
+    """Custom queryset for the model 'AnniversaryEvent'."""
+
+    def get_person_events(
+        self, person: Person, start_date: date, end_date: date
+    ) -> list["AnniversaryEvent"]:
+        """Returns the (unsaved) events of a person between 'start_date' and
+        'end_date'."""
+        return [
+            self.model(person=person, kind=kind, ordinal=ordinal, date=event_date)
+            for kind, ordinal, event_date in person.iter_anniversary_events(
+                start_date=start_date, end_date=end_date
+            )
+        ]
+
+    def rebuild(
+        self, people: Iterable[Person], start_date: date, end_date: date
+    ) -> int:
+        """Regenerates the events of the given people between 'start_date' and
+        'end_date', returns the number of events."""
+        people = list(people)
+        self.filter(person__in=people).delete()
+        events = [
+            event
+            for person in people
+            for event in self.get_person_events(person, start_date, end_date)
+        ]
+        return len(self.bulk_create(events, batch_size=BATCH_SIZE))
+
+    def roll_horizon(self, start_date: date, end_date: date) -> tuple[int, int]:
+        """Deletes the events outside the horizon and creates the missing ones,
+        returns the numbers of events deleted and created.
+
+        Events of a person are generated each year from the first one of the
+        horizon, so only people without events in the last year are extended,
+        from the year after their last event. Rolling an unchanged horizon
+        creates nothing."""
+        deleted, _counts = self.filter(
+            Q(date__lt=start_date) | Q(date__gt=end_date)
+        ).delete()
+        people = (
+            Person.objects.filter(
+                Q(date_of_birth__isnull=False) | Q(date_of_death__isnull=False)
+            )
+            .exclude(anniversaries_event__date__gte=date(end_date.year, 1, 1))
+            .annotate(last_event_date=Max("anniversaries_event__date"))
+            .only("id", "date_of_birth", "date_of_death")
+        )
+        created: int = 0
+        events: list[AnniversaryEvent] = []
+        for person in people.iterator(chunk_size=BATCH_SIZE):
+            last_event_date: date | None = person.last_event_date  # type: ignore[attr-defined]
+            first_date = (
+                start_date
+                if last_event_date is None
+                else date(last_event_date.year + 1, 1, 1)
+            )
+            events += self.get_person_events(person, first_date, end_date)
+            if len(events) >= BATCH_SIZE:
+                # Events created by a concurrent save are left untouched:
+                created += len(self.bulk_create(events, ignore_conflicts=True))
+                events = []
+        created += len(self.bulk_create(events, ignore_conflicts=True))
+        return deleted, created
+
+
+class AnniversaryEvent(models.Model):
+    """Class to materialize the anniversaries of a person within the horizon of
+    calendars, kept in sync when the person is saved."""
+
+    person = models.ForeignKey(
+        to=Person,
+        on_delete=models.CASCADE,
+        related_name="%(app_label)s_events",
+        related_query_name="%(app_label)s_event",
+        verbose_name=_("person"),
+    )
+
+    kind = models.PositiveSmallIntegerField(
+        choices=EVENT_KIND_CHOICES, verbose_name=_("kind")
+    )
+
+    date = models.DateField(verbose_name=_("date"))
+
+    ordinal = models.PositiveSmallIntegerField(
+        verbose_name=_("ordinal"),
+        help_text=_("Years since the event, 0 for the event itself."),
+    )
+
+    objects = AnniversaryEventQuerySet.as_manager()
+
+    class Meta:
+        """Metadata options class."""
+
+        ordering: list[str] = ["date"]
+        verbose_name = _("anniversary event")
+        verbose_name_plural = _("anniversary events")
+        indexes = [
+            models.Index(fields=["date", "kind"], name="anniversary_event_date_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["person", "kind", "ordinal"],
+                name="anniversary_event_unique_ordinal",
+            ),
+        ]
+
+    def __repr__(self) -> str:
+        """Returns an unambiguous description of the model (for developers)."""
+        return f"<{self.__class__.__name__} object ({self.pk})>"
+
+    def __str__(self) -> str:
+        """Returns a description of the model (for customers)."""
+        return f"{self.person} ({self.date})"
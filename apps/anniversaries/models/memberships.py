@@ -0,0 +1,100 @@
+"""Model definitions for the 'anniversaries' application."""
+
+from typing import Iterable
+from uuid import UUID
+
+from django.db import models
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+from .calendars import Calendar
+from .persons import Person
+
+BATCH_SIZE: int = 1000
+
+
+class CalendarMembershipQuerySet(models.QuerySet["CalendarMembership"]):
+    """Custom queryset for the model 'CalendarMembership'."""
+
+    def rebuild(
+        self,
+        calendar_ids: Iterable[UUID] | None = None,
+        person_ids: Iterable[UUID] | None = None,
+        excluded_family_ids: Iterable[UUID] = (),
+    ) -> int:
+        """Recomputes the memberships of the given calendars and people (all of
+        them by default) from their families, ignoring the excluded families
+        which are about to leave them. Returns the number of memberships."""
+        memberships = self.all()
+        person_families = Person.families.through.objects.exclude(
+            family__in=list(excluded_family_ids)
+        )
+        if calendar_ids is not None or person_ids is not None:
+            calendar_ids = list(calendar_ids or [])
+            person_ids = list(person_ids or [])
+            memberships = memberships.filter(
+                Q(calendar__in=calendar_ids) | Q(person__in=person_ids)
+            )
+            person_families = person_families.filter(
+                Q(family__anniversaries_calendar__in=calendar_ids)
+                | Q(person__in=person_ids)
+            )
+        memberships.delete()
+        pairs = person_families.values_list(
+            "family__anniversaries_calendar", "person"
+        ).distinct()
+        return len(
+            self.bulk_create(
+                [
+                    self.model(calendar_id=calendar_id, person_id=person_id)
+                    for calendar_id, person_id in pairs
+                    if calendar_id is not None
+                ],
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+        )
+
+
+class CalendarMembership(models.Model):
+    """Class to denormalize which people belong to a calendar through their
+    families, kept in sync when families join or leave calendars and when
+    people join or leave families."""
+
+    calendar = models.ForeignKey(
+        to=Calendar,
+        on_delete=models.CASCADE,
+        related_name="%(app_label)s_memberships",
+        related_query_name="%(app_label)s_membership",
+        verbose_name=_("calendar"),
+    )
+
+    person = models.ForeignKey(
+        to=Person,
+        on_delete=models.CASCADE,
+        related_name="%(app_label)s_calendar_memberships",
+        related_query_name="%(app_label)s_calendar_membership",
+        verbose_name=_("person"),
+    )
+
+    objects = CalendarMembershipQuerySet.as_manager()
+
+    class Meta:
+        """Metadata options class."""
+
+        verbose_name = _("calendar membership")
+        verbose_name_plural = _("calendar memberships")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["calendar", "person"],
+                name="calendar_membership_unique_person",
+            ),
+        ]
+
+    def __repr__(self) -> str:
+        """Returns an unambiguous description of the model (for developers)."""
+        return f"<{self.__class__.__name__} object ({self.pk})>"
+
+    def __str__(self) -> str:
+        """Returns a description of the model (for customers)."""
+        return f"{self.person} → {self.calendar}"
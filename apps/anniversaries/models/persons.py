@@ -1,24 +1,199 @@
 """Model definitions for the 'anniversaries' application."""
 
 import logging
-from datetime import date
+import operator
+from calendar import isleap
+from datetime import date, timedelta
+from functools import reduce
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 from uuid import uuid4
 
-from anniversaries.utils import IEvent, get_anniversary_list, get_ievent, get_ievent_uid
+from anniversaries.utils import (
+    IEvent,
+    IEventValues,
+    get_age,
+    get_anniversary_list,
+    get_ievent,
+    get_ievent_uid,
+    get_search_words,
+    get_yearly_rrule,
+    iter_anniversaries,
+    serialize_ievent,
+)
 from core.models.mixins import SensitiveMixin
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
 from django.db import models
+from django.db.models import (
+    Case,
+    Expression,
+    F,
+    Func,
+    IntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import (
+    Coalesce,
+    ExtractDay,
+    ExtractMonth,
+    ExtractYear,
+    Greatest,
+)
 from django.template.defaultfilters import date as format_date
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext_lazy
 
 from .families import Family
 
+if TYPE_CHECKING:
+    from .events import AnniversaryEvent
+
 NAMES_MAX_LENGHT: int = 255
+SEARCH_CONFIG: str = "simple"  # names are not stemmed
+EVENT_KIND_BIRTHDAY: int = 1
+EVENT_KIND_DEATH_ANNIVERSARY: int = 2
+EVENT_KIND_CHOICES: list[tuple[int, Any]] = [
+    (EVENT_KIND_BIRTHDAY, _("🎂 birthday")),
+    (EVENT_KIND_DEATH_ANNIVERSARY, _("🪦 death anniversary")),
+]
 
 logger = logging.getLogger(__name__)
 
 
+def get_month_day_expression(field: str) -> Expression:
+    """Returns an SQL expression for the month and day of a date field, as a
+    'MMDD' integer, for instance 1231 for December 31."""
+    return ExtractMonth(field) * 100 + ExtractDay(field)
+
+
+class PersonQuerySet(models.QuerySet["Person"]):
+    """Custom queryset for the model 'Person'."""
+
+    def search(self, text: str) -> "PersonQuerySet":
+        """Returns people whose names start with every word of 'text', regardless
+        of accents, annotated with their relevance ('search_rank').
+
+        The filtering is done by the database, relying on the search vector
+        index."""
+        words = get_search_words(text)
+        if not words:
+            return self
+        query = SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            config=SEARCH_CONFIG,
+            search_type="raw",
+        )
+        return self.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+
+    def with_current_age(self) -> "PersonQuerySet":
+        """Returns people annotated with their current age ('current_age'),
+        computed by the database like 'Person.get_current_age'."""
+        return self.annotate(
+            current_age=Case(
+                When(
+                    # GREATEST() ignores NULL values:
+                    date_of_birth__isnull=False,
+                    then=Greatest(
+                        Func(
+                            Coalesce("date_of_death", Value(date.today())),
+                            F("date_of_birth"),
+                            function="AGE",
+                            template="EXTRACT(YEAR FROM %(function)s(%(expressions)s))",
+                            output_field=IntegerField(),
+                        ),
+                        Value(0),
+                    ),
+                ),
+                output_field=IntegerField(),
+            )
+        )
+
+    def with_birthday_between(
+        self, start_date: date, end_date: date
+    ) -> "PersonQuerySet":
+        """Returns people having a birthday between 'start_date' and 'end_date'
+        (both included), annotated with the year of their first birthday in this
+        period ('birthday_year') and their age at that time ('birthday_age').
+
+        The filtering is done by the database, relying on the month/day index."""
+        ranges: dict[int, tuple[int, int]] = {}
+        for year in range(start_date.year, end_date.year + 1):
+            first_day = max(start_date, date(year, 1, 1))
+            last_day = min(end_date, date(year, 12, 31))
+            lower = first_day.month * 100 + first_day.day
+            if lower == 301 and not isleap(year):
+                # February 29 birthdays are celebrated on March 1 during common
+                # years, like in 'get_anniversary':
+                lower = 229
+            ranges[year] = (lower, last_day.month * 100 + last_day.day)
+
+        query = Q()
+        for bounds in ranges.values():
+            query |= Q(birthday_month_day__range=bounds)
+
+        return (
+            self.alias(birthday_month_day=get_month_day_expression("date_of_birth"))
+            .filter(query)
+            .annotate(
+                birthday_year=Case(
+                    *[
+                        When(birthday_month_day__range=bounds, then=Value(year))
+                        for year, bounds in ranges.items()
+                    ],
+                    output_field=IntegerField(),
+                ),
+                birthday_age=F("birthday_year") - ExtractYear("date_of_birth"),
+            )
+            .alias(
+                birthday_rank=F("birthday_year") * 10000 + F("birthday_month_day"),
+                death_rank=ExtractYear("date_of_death") * 10000
+                + get_month_day_expression("date_of_death"),
+            )
+            .filter(
+                # No more birthdays after the date of death:
+                Q(date_of_death__isnull=True) | Q(death_rank__gte=F("birthday_rank")),
+                birthday_age__gte=0,
+            )
+        )
+
+    def get_next_birthday_list(self, days: int) -> list[tuple["Person", int, date]]:
+        """Returns the list of birthdays from today (excluded) to "days" in the
+        future, in chronological order.
+
+        Birthdays are read from the materialized events, by date."""
+        today = date.today()
+        people = (
+            self.filter(
+                anniversaries_event__kind=EVENT_KIND_BIRTHDAY,
+                anniversaries_event__date__gt=today,
+                anniversaries_event__date__lte=today + timedelta(days=days),
+            )
+            .annotate(
+                birthday_date=F("anniversaries_event__date"),
+                birthday_age=F("anniversaries_event__ordinal"),
+            )
+            .order_by("birthday_date")
+        )
+        return [
+            (
+                person,
+                person.birthday_age,  # type: ignore[attr-defined]
+                person.birthday_date,  # type: ignore[attr-defined]
+            )
+            for person in people
+        ]
+
+
 class Person(SensitiveMixin, models.Model):
     """Class to represent someone."""
 
@@ -116,10 +291,31 @@ class Person(SensitiveMixin, models.Model):
         verbose_name=_("families"),
     )
 
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Names indexed for search, with their weight in relevance ranking:
+    SEARCH_FIELDS: dict[str, str] = {
+        "nickname": "A",
+        "first_name": "A",
+        "preferred_name": "A",
+        "birth_name": "B",
+        "married_name": "B",
+        "middle_names": "C",
+    }
+
+    objects = PersonQuerySet.as_manager()
+
     class Meta(SensitiveMixin.Meta):
         """Metadata options class."""
 
         ordering: list[str] = ["-date_of_birth"]
+        indexes = [
+            models.Index(
+                get_month_day_expression("date_of_birth"),
+                name="person_birthday_month_day_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="person_search_vector_idx"),
+        ]
         verbose_name = _("person")
         verbose_name_plural = _("people")
 
@@ -133,6 +329,32 @@ class Person(SensitiveMixin, models.Model):
         emoji: str = self.get_emoji()
         return " ".join([emoji, self.full_name, is_dead]).strip()
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Saves the model, keeping its search vector in sync with its names."""
+        self.search_vector = self.get_search_vector()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(update_fields) & set(self.SEARCH_FIELDS):
+            kwargs["update_fields"] = {*update_fields, "search_vector"}
+        super().save(*args, **kwargs)
+
+    def get_search_vector(self) -> Expression:
+        """Returns an SQL expression for the search vector of the model."""
+        words: dict[str, list[str]] = {}
+        for field, weight in self.SEARCH_FIELDS.items():
+            value: str | list[str] = getattr(self, field) or ""
+            words.setdefault(weight, []).extend(
+                get_search_words(" ".join(value) if isinstance(value, list) else value)
+            )
+        return reduce(
+            operator.add,
+            [
+                SearchVector(
+                    Value(" ".join(weight_words)), config=SEARCH_CONFIG, weight=weight
+                )
+                for weight, weight_words in words.items()
+            ],
+        )
+
     @property
     def last_name(self) -> str:
         """Returns the last name of the model."""
@@ -189,15 +411,17 @@ class Person(SensitiveMixin, models.Model):
         return emoji
 
     def get_current_age(self) -> int | None:
-        """Returns the current age of the model or None."""
+        """Returns the current age of the model or None, as annotated by
+        'PersonQuerySet.with_current_age' if available."""
+        if hasattr(self, "current_age"):
+            return self.current_age
+
         if not self.date_of_birth:
             return None
 
-        return len(
-            get_anniversary_list(
-                event_date=self.date_of_birth,
-                end_date=self.date_of_death or date.today(),
-            )
+        return get_age(
+            event_date=self.date_of_birth,
+            end_date=self.date_of_death or date.today(),
         )
 
     def get_birthday_list(self, end_date: date = date.today()) -> list[date]:
@@ -242,22 +466,70 @@ class Person(SensitiveMixin, models.Model):
             ]
         )
 
-    def get_birthday_ievent_list(self, end_date: date = date.today()) -> list[IEvent]:
-        """Returns the list of birthdays (including the date of birth) as
-        icalendar.Event list."""
-        ievents: list[IEvent] = []
-        for age, event_date in enumerate(self.get_birthday_list(end_date=end_date)):
-            ievents.append(
-                get_ievent(
-                    envent_date=event_date,
-                    uid=get_ievent_uid(
-                        root=str(self.id), context="birthday", index=age
-                    ),
-                    summary=self.get_birthday_ievent_summary(age=age),
-                    description=self.get_birthday_ievent_description(age=age),
-                )
+    def iter_birthday_ievent_values(
+        self, end_date: date = date.today(), start_date: date | None = None
+    ) -> Iterator[IEventValues]:
+        """Yields the values of birthday events (including the date of birth)
+        between 'start_date' and 'end_date'."""
+        if not self.date_of_birth:
+            return
+
+        for age, event_date in iter_anniversaries(
+            event_date=self.date_of_birth,
+            start_date=start_date or self.date_of_birth,
+            end_date=self.date_of_death or end_date,
+        ):
+            yield self.get_birthday_ievent_values(age=age, event_date=event_date)
+
+    def get_birthday_ievent_values(self, age: int, event_date: date) -> IEventValues:
+        """Returns the values of a birthday event."""
+        return IEventValues(
+            envent_date=event_date,
+            uid=get_ievent_uid(root=str(self.id), context="birthday", index=age),
+            summary=self.get_birthday_ievent_summary(age=age),
+            description=self.get_birthday_ievent_description(age=age),
+        )
+
+    def get_birthday_ievent_list(
+        self, end_date: date = date.today(), start_date: date | None = None
+    ) -> list[IEvent]:
+        """Returns the list of birthdays (including the date of birth) between
+        'start_date' and 'end_date' as icalendar.Event list."""
+        return [
+            get_ievent(**values)
+            for values in self.iter_birthday_ievent_values(
+                end_date=end_date, start_date=start_date
+            )
+        ]
+
+    def serialize_birthday_ievent_list(
+        self, end_date: date = date.today(), start_date: date | None = None
+    ) -> bytes:
+        """Returns the birthdays (including the date of birth) between
+        'start_date' and 'end_date' as serialized VEVENT components."""
+        return b"".join(
+            serialize_ievent(**values)
+            for values in self.iter_birthday_ievent_values(
+                end_date=end_date, start_date=start_date
             )
-        return ievents
+        )
+
+    def get_recurring_birthday_ievent_values(self) -> IEventValues | None:
+        """Returns the values of a single yearly recurring birthday event. Ages
+        are left out since they change every year."""
+        if not self.date_of_birth:
+            return None
+
+        return IEventValues(
+            envent_date=self.date_of_birth,
+            uid=get_ievent_uid(root=str(self.id), context="birthday-yearly"),
+            summary=f"🎂 {self.short_name}",
+            description=_("%(name)s was born on %(date)s")
+            % {"name": self.full_name, "date": format_date(self.date_of_birth)},
+            rrule=get_yearly_rrule(
+                event_date=self.date_of_birth, until=self.date_of_death
+            ),
+        )
 
     def get_death_anniversary_list(self, end_date: date = date.today()) -> list[date]:
         """Returns the list of death anniversaries (including the date of death)."""
@@ -301,21 +573,118 @@ class Person(SensitiveMixin, models.Model):
             ]
         )
 
+    def iter_death_anniversary_ievent_values(
+        self, end_date: date = date.today(), start_date: date | None = None
+    ) -> Iterator[IEventValues]:
+        """Yields the values of death anniversary events (including the date of
+        death) between 'start_date' and 'end_date'."""
+        if not self.date_of_death:
+            return
+
+        for age, event_date in iter_anniversaries(
+            event_date=self.date_of_death,
+            start_date=start_date or self.date_of_death,
+            end_date=end_date,
+        ):
+            yield self.get_death_anniversary_ievent_values(
+                age=age, event_date=event_date
+            )
+
+    def get_death_anniversary_ievent_values(
+        self, age: int, event_date: date
+    ) -> IEventValues:
+        """Returns the values of a death anniversary event."""
+        return IEventValues(
+            envent_date=event_date,
+            uid=get_ievent_uid(root=str(self.id), context="death", index=age),
+            summary=self.get_death_anniversary_ievent_summary(age=age),
+            description=self.get_death_anniversary_ievent_description(age=age),
+        )
+
     def get_death_anniversary_ievent_list(
-        self, end_date: date = date.today()
+        self, end_date: date = date.today(), start_date: date | None = None
     ) -> list[IEvent]:
         """Returns the list of death anniversaries (including the date of death)
-        as icalendar.Event list."""
-        ievents: list[IEvent] = []
-        for age, event_date in enumerate(
-            self.get_death_anniversary_list(end_date=end_date)
-        ):
-            ievents.append(
-                get_ievent(
-                    envent_date=event_date,
-                    uid=get_ievent_uid(root=str(self.id), context="death", index=age),
-                    summary=self.get_death_anniversary_ievent_summary(age=age),
-                    description=self.get_death_anniversary_ievent_description(age=age),
+        between 'start_date' and 'end_date' as icalendar.Event list."""
+        return [
+            get_ievent(**values)
+            for values in self.iter_death_anniversary_ievent_values(
+                end_date=end_date, start_date=start_date
+            )
+        ]
+
+    def serialize_death_anniversary_ievent_list(
+        self, end_date: date = date.today(), start_date: date | None = None
+    ) -> bytes:
+        """Returns the death anniversaries (including the date of death) between
+        'start_date' and 'end_date' as serialized VEVENT components."""
+        return b"".join(
+            serialize_ievent(**values)
+            for values in self.iter_death_anniversary_ievent_values(
+                end_date=end_date, start_date=start_date
+            )
+        )
+
+    def get_recurring_death_anniversary_ievent_values(self) -> IEventValues | None:
+        """Returns the values of a single yearly recurring death anniversary
+        event. Ages are left out since they change every year."""
+        if not self.date_of_death:
+            return None
+
+        return IEventValues(
+            envent_date=self.date_of_death,
+            uid=get_ievent_uid(root=str(self.id), context="death-yearly"),
+            summary=f"🪦 {self.short_name}",
+            description=_("%(name)s died on %(date)s")
+            % {"name": self.full_name, "date": format_date(self.date_of_death)},
+            rrule=get_yearly_rrule(event_date=self.date_of_death),
+        )
+
+    def serialize_recurring_ievent_list(
+        self, with_death_anniversary: bool = False
+    ) -> bytes:
+        """Returns the yearly recurring birthday event and, if required, the yearly
+        recurring death anniversary event as serialized VEVENT components."""
+        values_list = [self.get_recurring_birthday_ievent_values()]
+        if with_death_anniversary:
+            values_list.append(self.get_recurring_death_anniversary_ievent_values())
+        return b"".join(serialize_ievent(**values) for values in values_list if values)
+
+    def iter_anniversary_events(
+        self, start_date: date, end_date: date
+    ) -> Iterator[tuple[int, int, date]]:
+        """Yields '(kind, ordinal, date)' tuples for the birthdays and the death
+        anniversaries between 'start_date' and 'end_date', like the events of
+        calendars."""
+        if self.date_of_birth:
+            for age, event_date in iter_anniversaries(
+                event_date=self.date_of_birth,
+                start_date=start_date,
+                end_date=min(self.date_of_death or end_date, end_date),
+            ):
+                yield EVENT_KIND_BIRTHDAY, age, event_date
+        if self.date_of_death:
+            for age, event_date in iter_anniversaries(
+                event_date=self.date_of_death, start_date=start_date, end_date=end_date
+            ):
+                yield EVENT_KIND_DEATH_ANNIVERSARY, age, event_date
+
+    def serialize_event_ievent_list(
+        self, events: Iterable["AnniversaryEvent"]
+    ) -> bytes:
+        """Returns the given materialized events as serialized VEVENT components,
+        without computing their dates again."""
+        return b"".join(
+            serialize_ievent(
+                **(
+                    self.get_birthday_ievent_values(
+                        age=event.ordinal, event_date=event.date
+                    )
+                    if event.kind == EVENT_KIND_BIRTHDAY
+                    else self.get_death_anniversary_ievent_values(
+                        age=event.ordinal, event_date=event.date
+                    )
                 )
             )
-        return ievents
+            for event in events
+        )
@@ -0,0 +1,58 @@
+"""Model definitions for the 'anniversaries' application."""
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .persons import EVENT_KIND_BIRTHDAY, EVENT_KIND_CHOICES, Person
+
+
+class ReminderLog(models.Model):
+    """Class to record event reminders already sent to a user."""
+
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="%(app_label)s_reminder_logs",
+        related_query_name="%(app_label)s_reminder_log",
+        verbose_name=_("user"),
+    )
+
+    person = models.ForeignKey(
+        to=Person,
+        on_delete=models.CASCADE,
+        related_name="%(app_label)s_reminder_logs",
+        related_query_name="%(app_label)s_reminder_log",
+        verbose_name=_("person"),
+    )
+
+    event_date = models.DateField(verbose_name=_("event date"))
+
+    kind = models.PositiveSmallIntegerField(
+        choices=EVENT_KIND_CHOICES,
+        default=EVENT_KIND_BIRTHDAY,
+        verbose_name=_("kind"),
+    )
+
+    sent_at = models.DateTimeField(auto_now_add=True, verbose_name=_("sent at"))
+
+    class Meta:
+        """Metadata options class."""
+
+        ordering: list[str] = ["-sent_at"]
+        verbose_name = _("reminder log")
+        verbose_name_plural = _("reminder logs")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "person", "event_date", "kind"],
+                name="reminder_log_unique_event",
+            ),
+        ]
+
+    def __repr__(self) -> str:
+        """Returns an unambiguous description of the model (for developers)."""
+        return f"<{self.__class__.__name__} object ({self.pk})>"
+
+    def __str__(self) -> str:
+        """Returns a description of the model (for customers)."""
+        return f"{self.person} ({self.event_date}) → {self.user}"
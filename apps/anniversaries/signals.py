@@ -0,0 +1,225 @@
+"""Signal receivers of the 'anniversaries' application."""
+
+from typing import Any, Iterable
+from uuid import UUID
+
+from anniversaries.cache import bump_calendar_versions, bump_owner_versions
+from anniversaries.models import (
+    AnniversaryEvent,
+    Calendar,
+    CalendarMembership,
+    Family,
+    Person,
+)
+from anniversaries.models.events import get_event_horizon
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+
+def invalidate_calendars(
+    calendar_ids: Iterable[UUID], owner_ids: Iterable[int] | None = None
+) -> None:
+    """Invalidates the cache of the given calendars, and of their owners, once
+    the current transaction is committed, so that they can not be rebuilt from
+    outdated data. Owners are looked up unless they are given."""
+    calendar_ids = list(calendar_ids)
+    if not calendar_ids:
+        return
+    if owner_ids is None:
+        owner_ids = Calendar.objects.filter(pk__in=calendar_ids).values_list(
+            "created_by_id", flat=True
+        )
+    owner_ids = list(owner_ids)
+    transaction.on_commit(lambda: bump_calendar_versions(calendar_ids))
+    transaction.on_commit(lambda: bump_owner_versions(owner_ids))
+
+
+def get_family_calendar_ids(family_ids: Iterable[UUID]) -> list[UUID]:
+    """Returns the primary keys of the calendars including the given families."""
+    return list(
+        Calendar.objects.filter(families__in=list(family_ids))
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+
+
+@receiver(pre_save, sender=Calendar)
+def on_calendar_pre_save(sender: type[Calendar], instance: Calendar, **kwargs: Any):
+    """Remembers the owner of a calendar before it is saved, as it may change."""
+    del sender
+    previous_owner_id = None
+    if not instance._state.adding and not kwargs["raw"]:
+        previous_owner_id = (
+            Calendar.objects.filter(pk=instance.pk)
+            .values_list("created_by_id", flat=True)
+            .first()
+        )
+    setattr(instance, "_previous_owner_id", previous_owner_id)
+
+
+@receiver(post_save, sender=Calendar)
+@receiver(post_delete, sender=Calendar)
+def on_calendar_change(sender: type[Calendar], instance: Calendar, **kwargs: Any):
+    """Invalidates the cache of a calendar when it changes, and of its previous
+    owner if the calendar changed hands."""
+    del sender, kwargs
+    owner_ids = {instance.created_by_id, getattr(instance, "_previous_owner_id", None)}
+    invalidate_calendars(
+        [instance.pk], owner_ids=[owner_id for owner_id in owner_ids if owner_id]
+    )
+
+
+@receiver(post_save, sender=Family)
+@receiver(pre_delete, sender=Family)
+def on_family_change(sender: type[Family], instance: Family, **kwargs: Any):
+    """Invalidates the cache of the calendars including a family when it changes.
+    Deletions are caught before the relations to calendars disappear."""
+    del sender, kwargs
+    invalidate_calendars(get_family_calendar_ids([instance.pk]))
+
+
+@receiver(post_save, sender=Person)
+@receiver(pre_delete, sender=Person)
+def on_person_change(sender: type[Person], instance: Person, **kwargs: Any):
+    """Invalidates the cache of the calendars including a person when it changes.
+    Deletions are caught before the relations to families disappear."""
+    del sender, kwargs
+    invalidate_calendars(
+        get_family_calendar_ids(instance.families.values_list("pk", flat=True))
+    )
+
+
+@receiver(post_save, sender=Person)
+def on_person_save(
+    sender: type[Person],
+    instance: Person,
+    update_fields: frozenset[str] | None,
+    **kwargs: Any,
+):
+    """Regenerates the materialized events of a person when their dates may have
+    changed."""
+    del sender, kwargs
+    if update_fields is not None and not update_fields & {
+        "date_of_birth",
+        "date_of_death",
+    }:
+        return
+    AnniversaryEvent.objects.rebuild([instance], *get_event_horizon())
+
+
+@receiver(m2m_changed, sender=Person.families.through)
+def on_person_families_change(
+    sender: Any,
+    instance: Person | Family,
+    action: str,
+    reverse: bool,
+    pk_set: set[Any] | None,
+    **kwargs: Any,
+):
+    """Invalidates the cache of the calendars including the families a person
+    joins or leaves."""
+    del sender, kwargs
+    if action not in ["post_add", "post_remove", "pre_clear"]:
+        return
+    if reverse:  # from the family side
+        family_ids = [instance.pk]
+    elif action == "pre_clear":
+        family_ids = list(
+            instance.families.values_list("pk", flat=True)  # type: ignore[union-attr]
+        )
+    else:
+        family_ids = list(pk_set or [])
+    invalidate_calendars(get_family_calendar_ids(family_ids))
+
+
+@receiver(m2m_changed, sender=Calendar.families.through)
+def on_calendar_families_change(
+    sender: Any,
+    instance: Calendar | Family,
+    action: str,
+    reverse: bool,
+    pk_set: set[Any] | None,
+    **kwargs: Any,
+):
+    """Invalidates the cache of the calendars including or excluding families."""
+    del sender, kwargs
+    if action not in ["post_add", "post_remove", "pre_clear"]:
+        return
+    if not reverse:  # from the calendar side
+        invalidate_calendars([instance.pk])
+    elif action == "pre_clear":
+        invalidate_calendars(get_family_calendar_ids([instance.pk]))
+    else:
+        invalidate_calendars(pk_set or [])
+
+
+@receiver(pre_delete, sender=Family)
+def on_family_delete(sender: type[Family], instance: Family, **kwargs: Any):
+    """Updates the memberships of the calendars including a family before it is
+    deleted, along with its relations."""
+    del sender, kwargs
+    CalendarMembership.objects.rebuild(
+        calendar_ids=instance.anniversaries_calendars.values_list("pk", flat=True),
+        excluded_family_ids=[instance.pk],
+    )
+
+
+@receiver(m2m_changed, sender=Person.families.through)
+def on_person_families_membership_change(
+    sender: Any,
+    instance: Person | Family,
+    action: str,
+    reverse: bool,
+    pk_set: set[Any] | None,
+    **kwargs: Any,
+):
+    """Updates the calendar memberships of the people joining or leaving
+    families. When all the members of a family leave it, their memberships are
+    updated beforehand."""
+    del sender, kwargs
+    if not reverse:  # from the person side
+        if action in ["post_add", "post_remove", "post_clear"]:
+            CalendarMembership.objects.rebuild(person_ids=[instance.pk])
+    elif action in ["post_add", "post_remove"]:
+        CalendarMembership.objects.rebuild(person_ids=pk_set or [])
+    elif action == "pre_clear":
+        CalendarMembership.objects.rebuild(
+            person_ids=instance.anniversaries_family_members.values_list(  # type: ignore[union-attr]
+                "pk", flat=True
+            ),
+            excluded_family_ids=[instance.pk],
+        )
+
+
+@receiver(m2m_changed, sender=Calendar.families.through)
+def on_calendar_families_membership_change(
+    sender: Any,
+    instance: Calendar | Family,
+    action: str,
+    reverse: bool,
+    pk_set: set[Any] | None,
+    **kwargs: Any,
+):
+    """Updates the memberships of the calendars including or excluding families.
+    When a family leaves all its calendars, their memberships are updated
+    beforehand."""
+    del sender, kwargs
+    if not reverse:  # from the calendar side
+        if action in ["post_add", "post_remove", "post_clear"]:
+            CalendarMembership.objects.rebuild(calendar_ids=[instance.pk])
+    elif action in ["post_add", "post_remove"]:
+        CalendarMembership.objects.rebuild(calendar_ids=pk_set or [])
+    elif action == "pre_clear":
+        CalendarMembership.objects.rebuild(
+            calendar_ids=instance.anniversaries_calendars.values_list(  # type: ignore[union-attr]
+                "pk", flat=True
+            ),
+            excluded_family_ids=[instance.pk],
+        )
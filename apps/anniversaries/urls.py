@@ -1,6 +1,7 @@
 """URL configuration for the 'anniversaries' application."""
 
-from anniversaries.views import calendar_detail
+from anniversaries.views import acalendar_detail, calendar_detail
+from django.conf import settings
 from django.urls import URLPattern, URLResolver, path
 
 app_name: str = "anniversaries"
@@ -8,7 +9,7 @@ app_name: str = "anniversaries"
 urlpatterns: list[URLPattern | URLResolver] = [
     path(
         "calendars/<uuid:calendar_id>/<str:filename>",
-        calendar_detail,
+        acalendar_detail if settings.ASYNC_VIEWS else calendar_detail,
         name="calendar-detail",
     ),
 ]
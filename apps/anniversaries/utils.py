@@ -1,15 +1,31 @@
 """Useful methods to play with calendars"""
 
-from datetime import date, datetime, timedelta
+import re
+import unicodedata
+from datetime import UTC, date, datetime, timedelta
+from typing import Iterator, NotRequired, TypedDict
 
 from django.utils.timezone import get_current_timezone
 from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from icalendar import Calendar as ICalendar
 from icalendar import Event as IEvent
+from icalendar import vRecur
 
 from toolbox import __version__
 
+ICAL_LINE_LIMIT: int = 75  # octets, excluding the line break
+
+
+class IEventValues(TypedDict):
+    """Values from which an icalendar.Event is built or serialized."""
+
+    envent_date: date
+    uid: str
+    summary: str
+    description: str
+    rrule: NotRequired[str]
+
 
 def get_ievent_uid(*, root: str, context: str, index: int = 0) -> str:
     """Identifier generator for icalendar.Event.uid."""
@@ -34,12 +50,20 @@ def get_icalendar(*, title: str) -> ICalendar:
     return ical
 
 
+def get_icalendar_envelope(*, title: str) -> tuple[bytes, bytes]:
+    """Returns the serialized header and footer of an empty icalendar.Calendar
+    object, so that events can be streamed in between."""
+    footer: bytes = b"END:VCALENDAR\r\n"
+    return get_icalendar(title=title).to_ical().removesuffix(footer), footer
+
+
 def get_ievent(
     *,
     envent_date: date,
     uid: str,
     summary: str,
     description: str,
+    rrule: str = "",
     created_at: date = datetime.now(),
 ) -> IEvent:
     """Returns an icalendar.Event object."""
@@ -53,26 +77,161 @@ def get_ievent(
     event.add("sequence", 0)
     event.add("status", "CONFIRMED")
     event.add("transp", "TRANSPARENT")
+    if rrule:
+        event.add("rrule", vRecur.from_ical(rrule))
     event.add("summary", summary if summary else _("New event"))
     if description:
         event.add("description", description)
     return event
 
 
+def escape_itext(text: str) -> str:
+    """Escapes a value according to the iCalendar TEXT rules (RFC 5545, 3.3.11)."""
+    # NOTE: order matters!
+    return (
+        text.replace(r"\N", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", r"\;")
+        .replace(",", r"\,")
+        .replace("\r\n", r"\n")
+        .replace("\n", r"\n")
+    )
+
+
+def fold_icontent_line(line: str) -> str:
+    """Folds a content line so that no physical line is longer than 75 octets
+    (RFC 5545, 3.1), never splitting a multi-octet UTF-8 character."""
+    if line.isascii():
+        return "\r\n ".join(
+            line[i : i + ICAL_LINE_LIMIT - 1]
+            for i in range(0, len(line), ICAL_LINE_LIMIT - 1)
+        )
+
+    chars: list[str] = []
+    byte_count: int = 0
+    for char in line:
+        char_byte_len = len(char.encode("utf-8"))
+        byte_count += char_byte_len
+        if byte_count >= ICAL_LINE_LIMIT:
+            chars.append("\r\n ")
+            byte_count = char_byte_len
+        chars.append(char)
+    return "".join(chars)
+
+
+def format_idate(value: date) -> str:
+    """Formats a date as an iCalendar DATE value."""
+    return f"{value.year:04}{value.month:02}{value.day:02}"
+
+
+def format_idatetime_utc(value: datetime) -> str:
+    """Formats a datetime as an iCalendar UTC DATE-TIME value. Naive values are
+    considered as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return f"{format_idate(value)}T{value.hour:02}{value.minute:02}{value.second:02}Z"
+
+
+def get_yearly_rrule(*, event_date: date, until: date | None = None) -> str:
+    """Returns an iCalendar recurrence rule repeating 'event_date' every year."""
+    rrule: list[str] = ["FREQ=YEARLY"]
+    if until:
+        rrule.append(f"UNTIL={format_idate(until)}")
+    if (event_date.month, event_date.day) == (2, 29):
+        # The 60th day of the year is February 29 during leap years and March 1
+        # otherwise, like in 'get_anniversary':
+        rrule.append("BYYEARDAY=60")
+    return ";".join(rrule)
+
+
+def serialize_ievent(
+    *,
+    envent_date: date,
+    uid: str,
+    summary: str,
+    description: str,
+    rrule: str = "",
+    created_at: datetime = datetime.now(),
+) -> bytes:
+    """Returns a VEVENT serialized straight from its values, without building an
+    icalendar.Event object. The output is the same as 'get_ievent(...).to_ical()'."""
+    timestamp: str = format_idatetime_utc(created_at)
+    lines: list[str] = [
+        "BEGIN:VEVENT",
+        fold_icontent_line(
+            "SUMMARY:" + escape_itext(str(summary if summary else _("New event")))
+        ),
+        "DTSTART;VALUE=DATE:" + format_idate(envent_date),
+        "DTEND;VALUE=DATE:" + format_idate(envent_date + timedelta(days=1)),
+        "DTSTAMP:" + timestamp,
+        fold_icontent_line("UID:" + escape_itext(uid)),
+        "SEQUENCE:0",
+    ]
+    if rrule:
+        lines.append("RRULE:" + rrule)
+    lines.append("CREATED:" + timestamp)
+    if description:
+        lines.append(
+            fold_icontent_line("DESCRIPTION:" + escape_itext(str(description)))
+        )
+    lines += [
+        "LAST-MODIFIED:" + timestamp,
+        "STATUS:CONFIRMED",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+        "",
+    ]
+    return "\r\n".join(lines).encode("utf-8")
+
+
+def get_anniversary(*, event_date: date, year: int) -> date:
+    """Returns the anniversary date of 'event_date' for the given 'year'."""
+    try:
+        return event_date.replace(year=year)
+    except ValueError:
+        # Raised when the event date is February 29
+        # and current year is not a leap year.
+        return event_date.replace(year=year, month=3, day=1)
+
+
 def get_anniversary_list(*, event_date: date, end_date: date) -> list[date]:
     """Returns a list of anniversary dates from the 1st anniversary date to the last
     one before 'end_date'(included)."""
     dates: list[date] = []
 
     for year in range(event_date.year + 1, end_date.year + 1):
-        try:
-            anniversary = event_date.replace(year=year)
-        except ValueError:
-            # Raised when the event date is February 29
-            # and current year is not a leap year.
-            anniversary = event_date.replace(year=year, month=3, day=1)
+        anniversary = get_anniversary(event_date=event_date, year=year)
 
         if anniversary <= end_date:
             dates.append(anniversary)
 
     return dates
+
+
+def get_search_words(text: str) -> list[str]:
+    """Returns the words of a text in lowercase and without accents, as they are
+    indexed for search."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r"[^\W_]+", text)
+
+
+def get_age(*, event_date: date, end_date: date) -> int:
+    """Returns the number of anniversaries of 'event_date' until 'end_date'
+    (included), like the length of 'get_anniversary_list' but in constant time."""
+    age = end_date.year - event_date.year
+    if get_anniversary(event_date=event_date, year=end_date.year) > end_date:
+        age -= 1
+    return max(age, 0)
+
+
+def iter_anniversaries(
+    *, event_date: date, start_date: date, end_date: date
+) -> Iterator[tuple[int, date]]:
+    """Lazily yields '(ordinal, date)' tuples for the event itself (ordinal 0) and
+    its anniversaries, between 'start_date' and 'end_date' (both included)."""
+    for year in range(max(event_date.year, start_date.year), end_date.year + 1):
+        anniversary = get_anniversary(event_date=event_date, year=year)
+
+        if start_date <= anniversary <= end_date:
+            yield year - event_date.year, anniversary
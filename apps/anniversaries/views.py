@@ -1,19 +1,126 @@
 """View definitions for the 'anniversaries' application."""
 
+from datetime import datetime
 from uuid import UUID
 
+from anniversaries.cache import (
+    CachedICalendar,
+    aget_cached_icalendar_or_lock,
+    aiter_and_cache_icalendar,
+    get_cached_icalendar_or_lock,
+    get_icalendar_key,
+    iter_and_cache_icalendar,
+)
 from anniversaries.models import Calendar
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+STALE_WARNING: str = '110 - "Response is Stale"'
+
+
+def get_cached_icalendar_by_calendar(calendar_id: UUID) -> tuple[str, CachedICalendar]:
+    """Returns the cache key of the iCalendar of a calendar, and the iCalendar if
+    it is cached or being built by another request."""
+    key = get_icalendar_key(calendar_id)
+    return key, get_cached_icalendar_or_lock(key)
+
+
+async def aget_cached_icalendar_by_calendar(
+    calendar_id: UUID,
+) -> tuple[str, CachedICalendar]:
+    """Async version of 'get_cached_icalendar_by_calendar'."""
+    key = await sync_to_async(get_icalendar_key)(calendar_id)
+    return key, await aget_cached_icalendar_or_lock(key)
+
+
+def set_icalendar_headers(
+    response: HttpResponseBase, filename: str | None, etag: str, timestamp: int
+) -> HttpResponseBase:
+    """Sets the headers of an iCalendar response, the content ones unless it is
+    a "304 Not Modified" response."""
+    if filename is not None:
+        response.headers["Content-Type"] = "text/calendar"
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if response.headers.get("Warning") == STALE_WARNING:
+        # Validators of the current version must not be cached with stale content:
+        return response
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(timestamp)
+    return response
+
+
+def get_not_modified_response(
+    request: HttpRequest, etag: str, last_modified: datetime
+) -> tuple[HttpResponseBase | None, str, int]:
+    """Returns a "304 Not Modified" response if the client has an up-to-date
+    iCalendar, or None, along with the validators to send."""
+    etag = quote_etag(etag)
+    timestamp = int(last_modified.timestamp())
+    response: HttpResponseBase | None = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    return response, etag, timestamp
+
+
+def get_cached_icalendar_response(cached: CachedICalendar) -> HttpResponse:
+    """Returns a response with a cached iCalendar, flagged if it is stale."""
+    response = HttpResponse(cached.content)
+    if cached.stale:
+        response.headers["Warning"] = STALE_WARNING
+        response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 def calendar_detail(
     request: HttpRequest, calendar_id: UUID, filename: str
-) -> HttpResponse:
-    """Return an iCalendar object."""
-    del request
+) -> HttpResponseBase:
+    """Return an iCalendar object, from the cache or streamed as it is being built.
+
+    Clients polling an unchanged calendar get a "304 Not Modified" response
+    without the iCalendar being built. While a request builds it, concurrent
+    requests get the previous iCalendar, with a "Warning" header, or wait."""
     calendar = get_object_or_404(Calendar, pk=calendar_id)
-    response = HttpResponse(calendar.get_icalendar().decode("utf-8"))
-    response.headers["Content-Type"] = "text/calendar"
-    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return response
+    response, etag, timestamp = get_not_modified_response(
+        request, *calendar.get_icalendar_validators()
+    )
+    if response is not None:
+        return set_icalendar_headers(response, None, etag, timestamp)
+
+    key, cached = get_cached_icalendar_by_calendar(calendar.pk)
+    if cached.content is not None:
+        response = get_cached_icalendar_response(cached)
+    else:
+        response = StreamingHttpResponse(
+            iter_and_cache_icalendar(key, calendar.iter_icalendar(), cached.lock)
+        )
+    return set_icalendar_headers(response, filename, etag, timestamp)
+
+
+async def acalendar_detail(
+    request: HttpRequest, calendar_id: UUID, filename: str
+) -> HttpResponseBase:
+    """Async version of 'calendar_detail', for ASGI deployments.
+
+    No thread is held while the iCalendar is being built and downloaded: the
+    database is queried with the async ORM and events are serialized in worker
+    threads."""
+    calendar = await aget_object_or_404(Calendar, pk=calendar_id)
+    response, etag, timestamp = get_not_modified_response(
+        request, *await calendar.aget_icalendar_validators()
+    )
+    if response is not None:
+        return set_icalendar_headers(response, None, etag, timestamp)
+
+    key, cached = await aget_cached_icalendar_by_calendar(calendar.pk)
+    if cached.content is not None:
+        response = get_cached_icalendar_response(cached)
+    else:
+        response = StreamingHttpResponse(
+            aiter_and_cache_icalendar(key, calendar.aiter_icalendar(), cached.lock)
+        )
+    return set_icalendar_headers(response, filename, etag, timestamp)
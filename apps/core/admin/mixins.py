@@ -1,5 +1,6 @@
 """Generic admin mixins."""
 
+from core.admin.paginators import EstimatedCountPaginator
 from core.models.mixins import SensitiveMixin
 from django.contrib import admin
 
@@ -38,3 +39,13 @@ class SensitiveAdminMixin(admin.ModelAdmin):
                     del changed_obj
 
         super().save_related(request, form, formsets, change)
+
+
+class LargeTableAdminMixin(admin.ModelAdmin):
+    """Mixin to keep changelists of large tables fast: counts are estimated by
+    the database planner past a threshold, the unfiltered count is not computed
+    and deep pages are fetched by primary key."""
+
+    paginator = EstimatedCountPaginator
+
+    show_full_result_count = False
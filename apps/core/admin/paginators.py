@@ -0,0 +1,70 @@
+"""Generic admin paginators."""
+
+from typing import Any
+
+from core.utils import ESTIMATED_COUNT_THRESHOLD, get_estimated_count
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+DEFERRED_JOIN_OFFSET: int = 1_000  # rows
+
+
+class EstimatedCountPaginator(Paginator):
+    """A paginator trusting planner estimates rather than running 'COUNT(*)' on
+    large querysets, and fetching deep pages through a narrow subquery on the
+    primary key."""
+
+    threshold: int = ESTIMATED_COUNT_THRESHOLD
+    deferred_join_offset: int = DEFERRED_JOIN_OFFSET
+
+    is_count_estimated: bool = False
+
+    @cached_property
+    def count(self) -> int:
+        """Returns the number of objects, estimated above the threshold."""
+        if isinstance(self.object_list, QuerySet):
+            estimate = get_estimated_count(self.object_list)
+            if estimate is not None and estimate >= self.threshold:
+                self.is_count_estimated = True
+                return estimate
+        return super().count
+
+    def use_exact_count(self) -> None:
+        """Replaces the estimated count by the exact one, so that the number of
+        pages and the page links match the actual objects."""
+        self.__dict__["count"] = Paginator.count.func(self)  # type: ignore[attr-defined]
+        self.__dict__.pop("num_pages", None)
+        self.is_count_estimated = False
+
+    def page(self, number: Any) -> Page:
+        """Returns a page of objects. Beyond the deferred join offset, the rows
+        to skip are walked on the primary key only, then the page is fetched by
+        primary key.
+
+        When the estimated count is wrong, pages past the estimate are looked
+        up with the exact count and pages past the actual objects are clamped
+        to the last one, rather than being reported as missing."""
+        try:
+            number = self.validate_number(number)
+        except EmptyPage:
+            if not self.is_count_estimated:
+                raise
+            self.use_exact_count()
+            number = self.validate_number(number)
+        page = self.get_page_objects(number)
+        if self.is_count_estimated and number > 1 and not page:
+            self.use_exact_count()
+            page = self.get_page_objects(min(number, self.num_pages))
+        return page
+
+    def get_page_objects(self, number: int) -> Page:
+        """Returns a page of objects, from a valid page number."""
+        bottom = (number - 1) * self.per_page
+        if bottom < self.deferred_join_offset or not isinstance(
+            self.object_list, QuerySet
+        ):
+            return super().page(number)
+        top = bottom + self.per_page
+        primary_keys = self.object_list.values_list("pk", flat=True)[bottom:top]
+        return Page(self.object_list.filter(pk__in=list(primary_keys)), number, self)
@@ -11,3 +11,7 @@ class CoreConfig(AppConfig):
     label: str = "core"
     name: str = "core"
     verbose_name: StrOrPromise = _("Core")
+
+    def ready(self) -> None:
+        """Connects the signal receivers of the application."""
+        from core import signals  # noqa: F401 # pylint: disable=import-outside-toplevel,unused-import
@@ -0,0 +1,23 @@
+"""Register 'core' actions with 'manage.py'."""
+
+from typing import Any
+
+from core.stats import refresh_stats
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Command to refresh the cached statistics of the landing page."""
+
+    help: str = "Refresh statistics"
+
+    def handle(self, *args: str, **kwargs: Any) -> None:
+        """Computes fresh statistics and caches them."""
+        del args, kwargs
+        try:
+            stats = refresh_stats()
+        except Exception as error:
+            raise CommandError(error) from error
+        for name, count in stats.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(self.style.SUCCESS("Successfully refreshed statistics"))
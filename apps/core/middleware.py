@@ -0,0 +1,14 @@
+"""Middleware definitions for the 'core' application."""
+
+from core.models.sites import get_current_site
+from django.contrib.sites.middleware import CurrentSiteMiddleware
+from django.http import HttpRequest
+
+
+class CachedSiteMiddleware(CurrentSiteMiddleware):
+    """Middleware setting the current site, with its customization, on requests
+    without running any query once the site is loaded."""
+
+    def process_request(self, request: HttpRequest) -> None:
+        """Sets the current site on the request."""
+        request.site = get_current_site()  # type: ignore[attr-defined]
@@ -1,12 +1,59 @@
 """Model definitions to personalize the site."""
 
-from typing import Iterable
+import time
+from typing import Any, Iterable
 
+from django.conf import settings
 from django.contrib.sites.models import Site
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django_stubs_ext import StrOrPromise
 
+SITE_VERSION_KEY: str = "core:site:version"
+
+# Sites loaded with their customization by this process, with their version:
+_SITES: dict[int, tuple[int, Site]] = {}
+
+
+def get_site_version() -> int:
+    """Returns the version of the sites shared by all processes, initializes it
+    if required."""
+    version = cache.get(SITE_VERSION_KEY)
+    if version is None:
+        # A timestamp never collides with a version used before an eviction:
+        cache.add(SITE_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(SITE_VERSION_KEY)
+    return version
+
+
+def bump_site_version() -> None:
+    """Invalidates the sites loaded by every process."""
+    try:
+        cache.incr(SITE_VERSION_KEY)
+    except ValueError:
+        # Raised when the key does not exist (yet or anymore).
+        cache.set(SITE_VERSION_KEY, time.time_ns(), timeout=None)
+    _SITES.clear()
+
+
+def invalidate_sites() -> None:
+    """Invalidates the loaded sites once the current transaction is committed."""
+    transaction.on_commit(bump_site_version)
+
+
+def get_current_site() -> Site:
+    """Returns the current site along with its customization, both loaded once
+    per process and reloaded after any process saved them."""
+    site_id: int = settings.SITE_ID
+    version = get_site_version()
+    cached = _SITES.get(site_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    site = Site.objects.select_related("sitecustomization").get(pk=site_id)
+    _SITES[site_id] = (version, site)
+    return site
+
 
 class SiteCustomization(models.Model):
     """Class on which we rely to personalize the site."""
@@ -80,3 +127,10 @@ class SiteCustomization(models.Model):
             update_fields=update_fields,
         )
         Site.objects.clear_cache()  # Clear cached content
+        invalidate_sites()
+
+    def delete(self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:
+        """Deletes the current instance."""
+        deleted = super().delete(*args, **kwargs)
+        invalidate_sites()
+        return deleted
@@ -0,0 +1,15 @@
+"""Signal receivers of the 'core' application."""
+
+from typing import Any
+
+from core.models.sites import invalidate_sites
+from django.contrib.sites.models import Site
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+def site_changed(**kwargs: Any) -> None:
+    """Invalidates the sites loaded by every process."""
+    invalidate_sites()
@@ -0,0 +1,80 @@
+"""Statistics displayed by the 'core' application."""
+
+import logging
+from typing import Any
+
+from accounts.models import User
+from anniversaries.models import Calendar, Family, Person
+from core.utils import ESTIMATED_COUNT_THRESHOLD
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Func, QuerySet
+
+CACHE_PREFIX: str = "core"
+STATS_CACHE_KEY: str = f"{CACHE_PREFIX}:stats"
+STATS_CACHE_TIMEOUT: int = 60 * 10  # ten minutes
+
+logger = logging.getLogger(__name__)
+
+
+def get_stats_querysets() -> dict[str, QuerySet[Any]]:
+    """Returns the querysets to count, by statistic name."""
+    return {
+        "users": User.objects.filter(is_active=True),
+        "calendars": Calendar.objects.all(),
+        "families": Family.objects.all(),
+        "people": Person.objects.all(),
+    }
+
+
+def get_count_sql(queryset: QuerySet[Any]) -> tuple[str, list[Any]]:
+    """Returns an SQL scalar expression counting the rows of a queryset, or
+    estimating them from the table statistics on large tables."""
+    sql, params = (
+        queryset.order_by()
+        .annotate(row_count=Func(F("pk"), function="COUNT"))
+        .values("row_count")
+        .query.sql_with_params()
+    )
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    # 'reltuples' ignores filters, which is accurate enough on large tables:
+    estimate_sql = (
+        "SELECT reltuples::bigint FROM pg_class "
+        "WHERE oid = %s::regclass AND reltuples >= %s"
+    )
+    return (
+        f"COALESCE(({estimate_sql}), ({sql}))",
+        [table, ESTIMATED_COUNT_THRESHOLD, *params],
+    )
+
+
+def compute_stats() -> dict[str, int]:
+    """Returns fresh statistics, computed with a single query."""
+    names: list[str] = []
+    expressions: list[str] = []
+    params: list[Any] = []
+    for name, queryset in get_stats_querysets().items():
+        sql, sql_params = get_count_sql(queryset)
+        names.append(name)
+        expressions.append(sql)
+        params += sql_params
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(expressions)}", params)
+        row = cursor.fetchone()
+    return dict(zip(names, row))
+
+
+def refresh_stats() -> dict[str, int]:
+    """Computes fresh statistics and caches them."""
+    stats = compute_stats()
+    cache.set(STATS_CACHE_KEY, stats, timeout=STATS_CACHE_TIMEOUT)
+    logger.info("Statistics refreshed: %s.", stats)
+    return stats
+
+
+def get_stats() -> dict[str, int]:
+    """Returns the cached statistics, refreshed if they have expired."""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = refresh_stats()
+    return stats
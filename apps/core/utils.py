@@ -0,0 +1,34 @@
+"""Generic helpers."""
+
+import json
+from typing import Any
+
+from django.db import connections
+from django.db.models import QuerySet
+
+ESTIMATED_COUNT_THRESHOLD: int = 10_000  # rows
+
+
+def get_estimated_count(queryset: QuerySet[Any]) -> int | None:
+    """Returns the PostgreSQL planner estimate of the number of rows of a
+    queryset, without running it, or None if the table has never been analyzed.
+
+    Unfiltered querysets read the table statistics ('reltuples'), the others
+    the row estimate of their query plan ('EXPLAIN')."""
+    query = queryset.query
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if not query.where and not query.distinct and not query.combinator:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            # 'reltuples' is -1 until the first 'VACUUM' or 'ANALYZE':
+            return int(row[0]) if row and row[0] >= 0 else None
+        sql, params = query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -1,18 +1,21 @@
 """View definitions for the 'core' application."""
 
 import logging
-from datetime import date
 from typing import Any
 
-from accounts.models import User
-from anniversaries.models import Calendar, Family, Person
-from django.db.models import QuerySet
+from anniversaries.models import Calendar
+from core.stats import CACHE_PREFIX, get_stats
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from django.views.generic.base import TemplateView
 
 logger = logging.getLogger(__name__)
 
 UPCOMING_DAYS: int = 15
+LANDING_PAGE_CACHE_TIMEOUT: int = 60  # one minute
 
 
 class LandingPageView(TemplateView):
@@ -20,28 +23,40 @@ class LandingPageView(TemplateView):
 
     template_name = "core/landing.html"
 
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """Serves anonymous visitors from a cache, per site and language, unless
+        they have pending messages."""
+        if request.user.is_authenticated or len(get_messages(request)):
+            return super().get(request, *args, **kwargs)
+
+        key = f"{CACHE_PREFIX}:landing:{request.site.pk}:{get_language()}"  # type: ignore
+        content = cache.get(key)
+        if content is None:
+            response = super().get(request, *args, **kwargs)
+            response.render()  # type: ignore[attr-defined]
+            cache.set(key, response.content, timeout=LANDING_PAGE_CACHE_TIMEOUT)
+            return response
+        return HttpResponse(content)
+
     def get_context_data(self, **kwargs: int) -> dict[str, Any]:
         """Returns a dictionary representing the template context."""
         context = super().get_context_data(**kwargs)
 
-        # Add context data for stats:
+        # Add context data for stats, from a cached snapshot:
+        stats = get_stats()
         context["stats"] = {
-            _("users"): User.objects.filter(is_active=True).count(),
-            _("calendars"): Calendar.objects.all().count(),
-            _("families"): Family.objects.all().count(),
-            _("people"): Person.objects.all().count(),
+            _("users"): stats["users"],
+            _("calendars"): stats["calendars"],
+            _("families"): stats["families"],
+            _("people"): stats["people"],
         }
 
         # Add context data for anniversaries:
         context["upcoming_days"] = UPCOMING_DAYS
         if user := self.request.user:
             if user.is_authenticated:
-                events: list[tuple[Person, int, date]] = []
-                calendars: QuerySet[Calendar] = (
-                    user.anniversaries_calendars_as_owner.all()  # type: ignore
+                context["upcoming_birthdays"] = Calendar.get_owner_next_birthday_list(
+                    owner_id=user.pk, days=UPCOMING_DAYS
                 )
-                for calendar in calendars:
-                    events += calendar.get_next_birthday_list(days=UPCOMING_DAYS)
-                context["upcoming_birthdays"] = events
 
         return context
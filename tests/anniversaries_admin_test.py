@@ -0,0 +1,190 @@
+"""Test anniversaries admin module"""
+
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from anniversaries.models import Calendar, Family, Person
+from anniversaries.admin import PersonAdmin
+from core.admin.filters import TopValuesFieldListFilter
+from core.admin.paginators import EstimatedCountPaginator
+
+
+class ChangelistQueriesTestCase(TestCase):
+    """Admin changelists query budget test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.superuser = User.objects.create(
+            username="admin", is_staff=True, is_superuser=True
+        )
+        self.user = User.objects.create(username="jdoe", is_staff=True)
+        self.user.user_permissions.set(
+            Permission.objects.filter(content_type__app_label="anniversaries")
+        )
+
+    def add_rows(self, count: int) -> None:
+        """Adds a family, a person and a calendar per row, each with relations."""
+        for index in range(count):
+            family = Family.objects.create(
+                title=f"Family {index}", created_by=self.user, changed_by=self.user
+            )
+            family.users.add(self.superuser, self.user)
+            person = Person.objects.create(
+                first_name=f"Person {index}",
+                middle_names=[],
+                date_of_birth=date(1990, 1, 1),
+                created_by=self.user,
+                changed_by=self.user,
+            )
+            person.families.add(family)
+            calendar = Calendar.objects.create(
+                title=f"Calendar {index}", created_by=self.user, changed_by=self.user
+            )
+            calendar.families.add(family)
+
+    def count_queries(self, url: str) -> int:
+        """Returns the number of queries run to render a page."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_deep_pages(self) -> None:
+        """Deep pages of people are fetched by primary key"""
+        self.add_rows(5)
+        self.client.force_login(self.user)
+        url = reverse("admin:anniversaries_person_changelist")
+        names = []
+        with (
+            patch.object(PersonAdmin, "list_per_page", 2),
+            patch.object(EstimatedCountPaginator, "deferred_join_offset", 0),
+        ):
+            for page in range(1, 4):
+                # By first name, without action checkbox:
+                response = self.client.get(url, {"p": str(page), "o": "3"})
+                names += [
+                    person.first_name for person in response.context["cl"].result_list
+                ]
+        self.assertEqual(names, [f"Person {index}" for index in range(5)])
+
+    def test_query_budget(self) -> None:
+        """The number of queries does not depend on the number of rows"""
+        for user, model, budget in [
+            (self.superuser, "person", 7),
+            (self.superuser, "family", 7),
+            (self.superuser, "calendar", 7),
+            (self.user, "person", 9),  # with permission checks
+            (self.user, "family", 9),
+            (self.user, "calendar", 9),
+        ]:
+            url = reverse(f"admin:anniversaries_{model}_changelist")
+            self.client.force_login(user)
+            self.client.get(url)  # warms up the site cache
+            with self.subTest(user=user, model=model):
+                self.add_rows(2)
+                self.assertEqual(self.count_queries(url), budget)
+                self.add_rows(20)
+                self.assertEqual(self.count_queries(url), budget)
+
+
+class PersonSearchTestCase(TestCase):
+    """People admin search test case"""
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="admin", is_staff=True, is_superuser=True)
+        for first_name, middle_names in [("Hélène", []), ("Zoé", ["Hélène"])]:
+            Person.objects.create(
+                first_name=first_name,
+                middle_names=middle_names,
+                created_by=user,
+                changed_by=user,
+            )
+        self.client.force_login(user)
+        self.url = reverse("admin:anniversaries_person_changelist")
+
+    def test_relevance(self) -> None:
+        """Search results are ordered by relevance by default"""
+        response = self.client.get(self.url, {"q": "helene"})
+        self.assertEqual(
+            [person.first_name for person in response.context["cl"].result_list],
+            ["Hélène", "Zoé"],
+        )
+
+    def test_ordering(self) -> None:
+        """Search results can still be ordered by column"""
+        # By descending first name, after the action checkbox:
+        response = self.client.get(self.url, {"q": "helene", "o": "-4"})
+        self.assertEqual(
+            [person.first_name for person in response.context["cl"].result_list],
+            ["Zoé", "Hélène"],
+        )
+
+
+class TopValuesFilterTestCase(TestCase):
+    """People admin surname filters test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create(username="jdoe", is_staff=True)
+        self.user.user_permissions.set(
+            Permission.objects.filter(content_type__app_label="anniversaries")
+        )
+        other_user = User.objects.create(username="other")
+        for birth_name, count, created_by in [
+            ("Martin", 3, self.user),
+            ("Durand", 2, self.user),
+            ("Dupont", 1, self.user),
+            ("Hidden", 5, other_user),
+        ]:
+            for _index in range(count):
+                Person.objects.create(
+                    first_name="Someone",
+                    middle_names=[],
+                    birth_name=birth_name,
+                    created_by=created_by,
+                    changed_by=created_by,
+                )
+        self.client.force_login(self.user)
+        self.url = reverse("admin:anniversaries_person_changelist")
+
+    def get_choices(self, params: dict[str, str]) -> list[str]:
+        """Returns the choices displayed by the birth name filter."""
+        response = self.client.get(self.url, params)
+        [spec] = [
+            spec
+            for spec in response.context["cl"].filter_specs
+            if getattr(spec, "field_path", None) == "birth_name"
+        ]
+        return [
+            str(choice["display"]) for choice in spec.choices(response.context["cl"])
+        ][1:]
+
+    def test_top_values(self) -> None:
+        """Only the most frequent visible values are displayed, with counts"""
+        with patch.object(TopValuesFieldListFilter, "limit", 2):
+            self.assertEqual(self.get_choices({}), ["Martin (3)", "Durand (2)"])
+            self.assertEqual(
+                self.get_choices({"birth_name": "Dupont"}),
+                ["Martin (3)", "Durand (2)", "Dupont"],
+            )
+
+    def test_cache(self) -> None:
+        """Counts are cached for a short time"""
+        self.get_choices({})
+        with CaptureQueriesContext(connection) as context:
+            self.get_choices({})
+        self.assertFalse(
+            [
+                query
+                for query in context.captured_queries
+                if "GROUP BY" in query["sql"] and "birth_name" in query["sql"]
+            ]
+        )
@@ -0,0 +1,342 @@
+"""Test anniversaries management commands module"""
+
+import socket
+import socketserver
+import tempfile
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from accounts.models import User
+from anniversaries.cache import get_icalendar_key
+from anniversaries.management.commands.send_event_reminders import LOCK_ID
+from anniversaries.models import Calendar, Family, Person, ReminderLog
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """A stand-in SMTP server session, dropped after 'drop_after' messages."""
+
+    def reply(self, line: str) -> None:
+        """Sends a reply line to the client."""
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server: SMTPServer = self.server  # type: ignore[assignment]
+        server.sessions += 1
+        messages = 0
+        self.reply("220 localhost")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith("MAIL") and messages >= server.drop_after:
+                return  # drops the session
+            if command == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in [b".\r\n", b""]:
+                    pass
+                messages += 1
+                server.messages += 1
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    """A stand-in SMTP server counting sessions and messages."""
+
+    daemon_threads = True
+
+    def __init__(self, drop_after: int) -> None:
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.drop_after = drop_after
+        self.sessions = 0
+        self.messages = 0
+
+
+class SendEventRemindersTestCase(TestCase):
+    """Event reminders command test case"""
+
+    def setUp(self) -> None:
+        birthday = date.today() + timedelta(days=3)
+        for index in range(5):
+            user = User.objects.create(
+                username=f"user_{index}", email=f"user_{index}@example.com"
+            )
+            family = Family.objects.create(
+                title="Doe", created_by=user, changed_by=user
+            )
+            person = Person.objects.create(
+                first_name="Jane",
+                middle_names=[],
+                date_of_birth=date(birthday.year - 32, birthday.month, birthday.day),
+                created_by=user,
+                changed_by=user,
+            )
+            person.families.add(family)
+            calendar = Calendar.objects.create(
+                title="Doe", created_by=user, changed_by=user
+            )
+            calendar.families.add(family)
+
+    def send_event_reminders(
+        self, *, drop_after: int, batch_size: int, workers: int = 1
+    ) -> SMTPServer:
+        """Runs the command against a stand-in SMTP server."""
+        server = SMTPServer(drop_after=drop_after)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=server.server_address[1],
+        ):
+            out = StringIO()
+            call_command(
+                "send_event_reminders",
+                batch_size=batch_size,
+                workers=workers,
+                stdout=out,
+            )
+        self.assertIn("Successfully sent 5 event reminder(s)", out.getvalue())
+        return server
+
+    def test_connection_reuse(self) -> None:
+        """One SMTP session is opened per batch of messages"""
+        server = self.send_event_reminders(drop_after=100, batch_size=2)
+        self.assertEqual(server.messages, 5)
+        self.assertEqual(server.sessions, 3)
+
+    def test_reconnection(self) -> None:
+        """Dropped sessions are reopened"""
+        server = self.send_event_reminders(drop_after=1, batch_size=5)
+        self.assertEqual(server.messages, 5)
+        self.assertEqual(server.sessions, 5)
+
+    def test_workers(self) -> None:
+        """Messages are shared out between workers, each with its own sessions"""
+        server = self.send_event_reminders(drop_after=100, batch_size=5, workers=3)
+        self.assertEqual(server.messages, 5)
+        self.assertLessEqual(server.sessions, 3)
+
+    def test_batch_size(self) -> None:
+        """Batches must hold at least one message"""
+        with self.assertRaisesMessage(CommandError, "at least 1"):
+            call_command("send_event_reminders", batch_size=0, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_workers_count(self) -> None:
+        """At least one worker sends the messages"""
+        with self.assertRaisesMessage(CommandError, "at least 1"):
+            call_command("send_event_reminders", workers=0, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_smtp_outage(self) -> None:
+        """Messages are counted as failed when no SMTP session can be opened"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        out = StringIO()
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=port,
+        ):
+            call_command("send_event_reminders", workers=2, stdout=out)
+        self.assertIn("Sent 0 event reminder(s), failed to send 5", out.getvalue())
+        self.assertFalse(ReminderLog.objects.exists())
+
+    def test_compute_error(self) -> None:
+        """Workers are stopped when computing reminders fails"""
+
+        def get_reminders(**kwargs):
+            raise ValueError("Broken query")
+            yield  # pylint: disable=unreachable
+
+        with patch(
+            "anniversaries.management.commands.send_event_reminders.get_reminders",
+            get_reminders,
+        ):
+            with self.assertRaisesMessage(CommandError, "Broken query"):
+                call_command("send_event_reminders", workers=2, stdout=StringIO())
+
+    def test_dry_run(self) -> None:
+        """Dry runs time each stage without sending anything"""
+        out = StringIO()
+        call_command("send_event_reminders", dry_run=True, workers=2, stdout=out)
+        self.assertIn("Processed 5 event reminder(s)", out.getvalue())
+        for stage in ["compute", "render", "send"]:
+            self.assertIn(f"{stage}: ", out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(ReminderLog.objects.exists())
+
+    def test_idempotency(self) -> None:
+        """Reminders already sent are not sent again"""
+        call_command("send_event_reminders", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(ReminderLog.objects.count(), 5)
+        out = StringIO()
+        call_command("send_event_reminders", stdout=out)
+        self.assertIn("Successfully sent 0 event reminder(s)", out.getvalue())
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_lock(self) -> None:
+        """Overlapping runs do not send reminders twice"""
+        other_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        self.addCleanup(other_connection.close)
+        with other_connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", [LOCK_ID])
+        out = StringIO()
+        call_command("send_event_reminders", stdout=out)
+        self.assertIn("Event reminders are already being sent", out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class EventRemindersDigestTestCase(TestCase):
+    """Event reminders digest test case"""
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="jdoe", email="jdoe@example.com")
+        birthday = date.today() + timedelta(days=3)
+        families = []
+        for first_name in ["Jane", "John"]:
+            family = Family.objects.create(
+                title=first_name, created_by=user, changed_by=user
+            )
+            person = Person.objects.create(
+                first_name=first_name,
+                middle_names=[],
+                date_of_birth=date(birthday.year - 32, birthday.month, birthday.day),
+                created_by=user,
+                changed_by=user,
+            )
+            person.families.add(family)
+            families.append(family)
+        for title, calendar_families in [("Both", families), ("Jane", families[:1])]:
+            calendar = Calendar.objects.create(
+                title=title, created_by=user, changed_by=user
+            )
+            calendar.families.add(*calendar_families)
+
+    def test_per_calendar(self) -> None:
+        """One message per calendar, with the events of this calendar only"""
+        call_command("send_event_reminders", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        both, jane = sorted(mail.outbox, key=lambda message: message.subject)
+        self.assertIn("Jane", both.body)
+        self.assertIn("John", both.body)
+        self.assertIn("Jane", jane.body)
+        self.assertNotIn("John", jane.body)
+        self.assertEqual(ReminderLog.objects.count(), 2)
+
+    def test_no_events(self) -> None:
+        """Calendars without new events get no message, on any run"""
+        user = User.objects.get(username="jdoe")
+        Calendar.objects.create(title="Empty", created_by=user, changed_by=user)
+        call_command("send_event_reminders", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(
+            [message for message in mail.outbox if "Empty" in message.subject]
+        )
+        call_command("send_event_reminders", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_digest(self) -> None:
+        """One message per user, without duplicated events"""
+        call_command("send_event_reminders", digest=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Both, 🎂 Jane)", mail.outbox[0].subject)
+        self.assertEqual(mail.outbox[0].body.count("Jane will be 32"), 1)
+        self.assertEqual(mail.outbox[0].body.count("John will be 32"), 1)
+
+
+class FrozenDate(date):
+    """A date whose today is the 15th of June of the current year, within the
+    horizon of materialized events."""
+
+    @classmethod
+    def today(cls) -> "FrozenDate":
+        return cls(date.today().year, 6, 15)
+
+
+class WarmCalendarFeedsTestCase(TransactionTestCase):
+    """Calendar feeds warm-up test case"""
+
+    def setUp(self) -> None:
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        shared_cache = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": directory,
+        }
+        self.enterContext(override_settings(CACHES={"default": shared_cache}))
+        user = User.objects.create(username="jdoe")
+        self.calendars: dict[str, Calendar] = {}
+        for first_name, date_of_birth in [
+            ("Jane", date(1988, 6, 15)),
+            ("John", date(1990, 3, 1)),
+        ]:
+            family = Family.objects.create(
+                title=first_name, created_by=user, changed_by=user
+            )
+            person = Person.objects.create(
+                first_name=first_name,
+                middle_names=[],
+                date_of_birth=date_of_birth,
+                created_by=user,
+                changed_by=user,
+            )
+            person.families.add(family)
+            calendar = Calendar.objects.create(
+                title=first_name, created_by=user, changed_by=user
+            )
+            calendar.families.add(family)
+            self.calendars[first_name] = calendar
+
+    def get_cached_titles(self) -> list[str]:
+        """Returns the titles of the calendars with a cached feed."""
+        return [
+            title
+            for title, calendar in self.calendars.items()
+            if cache.get(get_icalendar_key(calendar.pk)) is not None
+        ]
+
+    def test_today_only(self) -> None:
+        """Only calendars with events today can be warmed up"""
+        with patch(
+            "anniversaries.management.commands.warm_calendar_feeds.date", FrozenDate
+        ):
+            call_command(
+                "warm_calendar_feeds", workers=1, today_only=True, stdout=StringIO()
+            )
+        self.assertEqual(self.get_cached_titles(), ["Jane"])
+
+    def test_local_cache(self) -> None:
+        """Feeds are not warmed up in a cache local to the command process"""
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            }
+        ):
+            with self.assertRaisesMessage(CommandError, "local to this process"):
+                call_command("warm_calendar_feeds", workers=1, stdout=StringIO())
+        self.assertEqual(self.get_cached_titles(), [])
+
+    def test_process_pool(self) -> None:
+        """Feeds built by worker processes are cached by the command"""
+        stdout = StringIO()
+        call_command("warm_calendar_feeds", workers=2, stdout=stdout)
+        self.assertIn("Successfully warmed 2 feed(s)", stdout.getvalue())
+        self.assertEqual(self.get_cached_titles(), ["Jane", "John"])
+        with self.assertNumQueries(0):
+            cached = cache.get(get_icalendar_key(self.calendars["Jane"].pk))
+        self.assertEqual(cached, b"".join(self.calendars["Jane"].iter_icalendar()))
@@ -0,0 +1,396 @@
+"""Test anniversaries models module"""
+
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from icalendar import Calendar as ICalendar
+
+from accounts.models import User
+from anniversaries.models import (
+    AnniversaryEvent,
+    Calendar,
+    CalendarMembership,
+    Family,
+    Person,
+)
+from anniversaries.models.events import get_event_horizon
+from anniversaries.utils import iter_anniversaries
+
+
+class PersonQuerySetTestCase(TestCase):
+    """Person queryset test case"""
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="jdoe")
+        for date_of_birth, date_of_death in [
+            (date(1938, 2, 14), None),
+            (date(1988, 2, 29), None),
+            (date(1992, 2, 28), None),
+            (date(1990, 3, 1), None),
+            (date(1985, 12, 31), None),
+            (date(2000, 1, 1), None),
+            (date(1930, 3, 1), date(2023, 2, 27)),
+            (date(1930, 3, 1), date(2023, 3, 1)),
+            (date(2030, 1, 1), None),  # not born yet
+            (None, None),
+        ]:
+            Person.objects.create(
+                first_name="Someone",
+                middle_names=[],
+                date_of_birth=date_of_birth,
+                date_of_death=date_of_death,
+                created_by=user,
+                changed_by=user,
+            )
+
+    def test_with_birthday_between(self) -> None:
+        """Database filtering matches the anniversary iterator"""
+        for start_date, end_date in [
+            (date(2023, 2, 27), date(2023, 3, 2)),  # common year
+            (date(2024, 2, 27), date(2024, 3, 2)),  # leap year
+            (date(2023, 3, 1), date(2023, 3, 1)),
+            (date(2024, 2, 29), date(2024, 2, 29)),
+            (date(2023, 12, 25), date(2024, 1, 5)),  # year wrap-around
+            (date(2023, 1, 1), date(2025, 12, 31)),
+        ]:
+            expected = {}
+            for person in Person.objects.filter(date_of_birth__isnull=False):
+                assert person.date_of_birth is not None
+                anniversaries = iter_anniversaries(
+                    event_date=person.date_of_birth,
+                    start_date=start_date,
+                    end_date=person.date_of_death or end_date,
+                )
+                for age, day in anniversaries:
+                    if day <= end_date:
+                        expected[person.pk] = (age, day.year)
+                    break
+
+            people = Person.objects.with_birthday_between(start_date, end_date)
+            with self.subTest(start_date=start_date, end_date=end_date):
+                self.assertEqual(
+                    {
+                        person.pk: (person.birthday_age, person.birthday_year)  # type: ignore[attr-defined]
+                        for person in people
+                    },
+                    expected,
+                )
+
+    def test_with_current_age(self) -> None:
+        """Database ages match the ones computed in Python"""
+        people = Person.objects.with_current_age()
+        self.assertEqual(
+            {person.pk: person.current_age for person in people},  # type: ignore[attr-defined]
+            {person.pk: person.get_current_age() for person in Person.objects.all()},
+        )
+
+    def test_index_usage(self) -> None:
+        """The month/day expression matches the functional index"""
+        today = date.today()
+        people = Person.objects.with_birthday_between(today, today + timedelta(7))
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn("person_birthday_month_day_idx", people.explain())
+
+
+class PersonSearchTestCase(TestCase):
+    """Person full-text search test case"""
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="jdoe")
+        for first_name, middle_names, birth_name in [
+            ("Zoé", ["Marie", "Hélène"], "Dupont"),
+            ("Zoe", [], "Durand"),
+            ("Jean-Noël", ["Zoé"], "Martin"),
+        ]:
+            Person.objects.create(
+                first_name=first_name,
+                middle_names=middle_names,
+                birth_name=birth_name,
+                created_by=user,
+                changed_by=user,
+            )
+
+    def search(self, text: str) -> list[str]:
+        """Returns the first names of people matching 'text', by relevance."""
+        people = Person.objects.search(text).order_by("-search_rank", "first_name")
+        return [person.first_name for person in people]
+
+    def test_search(self) -> None:
+        """Search is accent and case insensitive, matches word prefixes of every
+        name field and requires every word"""
+        self.assertEqual(self.search("helene"), ["Zoé"])
+        self.assertEqual(self.search("ZOE"), ["Zoe", "Zoé", "Jean-Noël"])
+        self.assertEqual(self.search("noel"), ["Jean-Noël"])
+        self.assertEqual(self.search("du"), ["Zoe", "Zoé"])
+        self.assertEqual(self.search("zoe dur"), ["Zoe"])
+        self.assertEqual(self.search("zoe smith"), [])
+        self.assertEqual(Person.objects.search(" !? ").count(), 3)
+
+    def test_save(self) -> None:
+        """The search vector follows changes of names"""
+        person = Person.objects.get(first_name="Zoe")
+        person.married_name = "Bernard"
+        person.save(update_fields=["married_name"])
+        self.assertEqual(self.search("bernard"), ["Zoe"])
+
+    def test_index_usage(self) -> None:
+        """Search relies on the search vector index"""
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn(
+            "person_search_vector_idx", Person.objects.search("zoe").explain()
+        )
+
+
+class AnniversaryEventTestCase(TestCase):
+    """Materialized anniversary events test case"""
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="jdoe")
+        family = Family.objects.create(title="Doe", created_by=user, changed_by=user)
+        today = date.today()
+        self.people = []
+        for first_name, date_of_birth, date_of_death in [
+            ("Jane", date(1988, 2, 29), None),
+            ("John", date(1930, 3, 1), date(today.year - 2, 3, 1)),
+            ("Baby", today - timedelta(days=100), None),
+        ]:
+            person = Person.objects.create(
+                first_name=first_name,
+                middle_names=[],
+                date_of_birth=date_of_birth,
+                date_of_death=date_of_death,
+                created_by=user,
+                changed_by=user,
+            )
+            person.families.add(family)
+            self.people.append(person)
+        self.calendar = Calendar.objects.create(
+            title="Doe family",
+            hide_death_anniversaries=False,
+            created_by=user,
+            changed_by=user,
+        )
+        self.calendar.families.add(family)
+
+    def get_events(self, person: Person) -> list[tuple[int, int, date]]:
+        """Returns the materialized events of a person."""
+        return list(
+            AnniversaryEvent.objects.filter(person=person)
+            .order_by("kind", "date")
+            .values_list("kind", "ordinal", "date")
+        )
+
+    def test_person_save(self) -> None:
+        """Events are regenerated when the dates of a person change"""
+        jane = self.people[0]
+        self.assertEqual(
+            self.get_events(jane),
+            list(jane.iter_anniversary_events(*get_event_horizon())),
+        )
+        jane.date_of_birth = date(1988, 3, 1)
+        jane.save()
+        self.assertTrue(
+            all(
+                event_date.day == 1
+                for _kind, _ordinal, event_date in self.get_events(jane)
+            )
+        )
+        with CaptureQueriesContext(connection) as context:
+            jane.save(update_fields=["nickname"])
+        self.assertFalse(
+            [
+                query
+                for query in context.captured_queries
+                if "anniversaries_anniversaryevent" in query["sql"]
+            ]
+        )
+
+    def test_feed(self) -> None:
+        """Feeds built from events match the ones computed in Python"""
+        start_date, end_date = self.calendar.get_date_range()
+        people = list(self.calendar.get_feed_people(start_date, end_date))
+        self.assertTrue(people[0].anniversary_events)  # type: ignore[attr-defined]
+        self.assertEqual(
+            self.calendar.serialize_people(people, start_date, end_date),
+            self.calendar.serialize_people(
+                list(self.calendar.people()), start_date, end_date
+            ),
+        )
+
+    def test_recurring_feed(self) -> None:
+        """Recurring feeds have one yearly event per person and death, whatever
+        the years behind and ahead"""
+        jane, john, baby = self.people
+        self.calendar.use_recurring_events = True
+        birthdays = {
+            f"{jane.pk}_birthday-yearly_0": (
+                date(1988, 2, 29),
+                {"FREQ": ["YEARLY"], "BYYEARDAY": [60]},
+            ),
+            f"{john.pk}_birthday-yearly_0": (
+                date(1930, 3, 1),
+                {"FREQ": ["YEARLY"], "UNTIL": [john.date_of_death]},
+            ),
+            f"{baby.pk}_birthday-yearly_0": (baby.date_of_birth, {"FREQ": ["YEARLY"]}),
+        }
+        deaths = {
+            f"{john.pk}_death-yearly_0": (john.date_of_death, {"FREQ": ["YEARLY"]}),
+        }
+        for hide_death_anniversaries, years_behind, years_ahead, expected in [
+            (True, 1, 1, birthdays),
+            (False, 0, 0, birthdays | deaths),
+            (False, 10, 5, birthdays | deaths),
+        ]:
+            self.calendar.hide_death_anniversaries = hide_death_anniversaries
+            self.calendar.years_behind = years_behind
+            self.calendar.years_ahead = years_ahead
+            ical = ICalendar.from_ical(b"".join(self.calendar.iter_icalendar()))
+            events = ical.walk("VEVENT")
+            with self.subTest(
+                hide_death_anniversaries=hide_death_anniversaries,
+                years_behind=years_behind,
+                years_ahead=years_ahead,
+            ):
+                self.assertEqual(len(events), len(expected))
+                self.assertEqual(
+                    {
+                        str(event["UID"]): (
+                            event.decoded("DTSTART"),
+                            dict(event["RRULE"]),
+                        )
+                        for event in events
+                    },
+                    expected,
+                )
+
+    def test_roll_horizon(self) -> None:
+        """Rolling the horizon deletes past events and creates the missing ones"""
+        baby = self.people[2]
+        AnniversaryEvent.objects.filter(person=baby).delete()
+        start_date, end_date = get_event_horizon()
+        deleted, created = AnniversaryEvent.objects.roll_horizon(
+            start_date + timedelta(days=366), end_date
+        )
+        self.assertGreater(deleted, 0)
+        self.assertEqual(created, len(self.get_events(baby)))
+        self.assertFalse(
+            AnniversaryEvent.objects.filter(date__lt=start_date + timedelta(days=366))
+        )
+
+    def test_roll_horizon_incremental(self) -> None:
+        """Rolling the horizon only creates the events of the new years"""
+        start_date, end_date = get_event_horizon()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(
+                AnniversaryEvent.objects.roll_horizon(start_date, end_date), (0, 0)
+            )
+        self.assertFalse(
+            [query for query in context.captured_queries if "INSERT" in query["sql"]]
+        )
+
+        end_date = date(end_date.year + 2, 12, 31)
+        _deleted, created = AnniversaryEvent.objects.roll_horizon(start_date, end_date)
+        self.assertEqual(created, 2 * 2 + 2)  # two birthdays and one death a year
+        for person in self.people:
+            with self.subTest(person=person.first_name):
+                self.assertEqual(
+                    self.get_events(person),
+                    list(person.iter_anniversary_events(start_date, end_date)),
+                )
+
+    def test_next_birthday_list(self) -> None:
+        """Upcoming birthdays are read from events"""
+        today = date.today()
+        birthdays = self.calendar.people().get_next_birthday_list(days=366)
+        self.assertEqual(
+            [event_date for _person, _age, event_date in birthdays],
+            sorted(event_date for _person, _age, event_date in birthdays),
+        )
+        self.assertEqual(
+            {person.first_name for person, _age, _event_date in birthdays},
+            {"Jane", "Baby"},
+        )
+        for person, age, event_date in birthdays:
+            self.assertGreater(event_date, today)
+            self.assertEqual(age, event_date.year - person.date_of_birth.year)  # type: ignore[union-attr]
+
+
+class CalendarMembershipTestCase(TestCase):
+    """Denormalized calendar memberships test case"""
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="jdoe")
+        self.families = [
+            Family.objects.create(title=title, created_by=user, changed_by=user)
+            for title in ["Doe", "Smith"]
+        ]
+        self.people = [
+            Person.objects.create(
+                first_name=first_name, middle_names=[], created_by=user, changed_by=user
+            )
+            for first_name in ["Jane", "John", "Jack"]
+        ]
+        self.calendars = [
+            Calendar.objects.create(title=title, created_by=user, changed_by=user)
+            for title in ["Doe", "Both"]
+        ]
+
+    def assert_in_sync(self) -> None:
+        """Checks that the people of calendars match their families."""
+        for calendar in Calendar.objects.all():
+            self.assertEqual(
+                set(calendar.people()),
+                set(Person.objects.filter(families__in=calendar.families.all())),
+            )
+
+    def test_signals(self) -> None:
+        """Memberships follow families joining or leaving calendars and people
+        joining or leaving families, from both sides"""
+        doe, smith = self.families
+        jane, john, jack = self.people
+        doe_calendar, both_calendar = self.calendars
+        doe_calendar.families.add(doe)
+        smith.anniversaries_calendars.add(both_calendar)
+        both_calendar.families.add(doe)
+        jane.families.add(doe, smith)
+        doe.anniversaries_family_members.add(john)
+        smith.anniversaries_family_members.add(jack)
+        self.assert_in_sync()
+        self.assertEqual(len(doe_calendar.people()), 2)
+        self.assertEqual(len(both_calendar.people()), 3)
+
+        for change in [
+            lambda: jane.families.remove(doe),
+            lambda: smith.anniversaries_family_members.clear(),
+            lambda: doe_calendar.families.clear(),
+            lambda: doe.anniversaries_calendars.clear(),
+            lambda: both_calendar.families.add(doe, smith),
+            lambda: jack.families.add(smith),
+            lambda: doe.delete(),
+            lambda: jack.families.clear(),
+        ]:
+            change()
+            self.assert_in_sync()
+
+    def test_rebuild_command(self) -> None:
+        """Memberships can be rebuilt in bulk"""
+        self.calendars[0].families.add(*self.families)
+        for person, family in zip(self.people, self.families):
+            person.families.add(family)
+        CalendarMembership.objects.all().delete()
+        stdout = StringIO()
+        call_command("rebuild_calendar_memberships", stdout=stdout)
+        self.assertIn("rebuilt 2 calendar membership(s)", stdout.getvalue())
+        self.assert_in_sync()
+
+    def test_single_lookup(self) -> None:
+        """People are looked up without joining families nor sorting them"""
+        sql = str(self.calendars[0].people().query)
+        self.assertNotIn("DISTINCT", sql)
+        self.assertNotIn("anniversaries_family", sql)
@@ -0,0 +1,152 @@
+"""Test anniversaries utils module"""
+
+from datetime import UTC, date, datetime, timedelta, timezone
+from itertools import product
+
+from dateutil.rrule import rrulestr  # type: ignore[import-untyped]
+from django.test import SimpleTestCase
+
+from anniversaries.utils import (
+    get_age,
+    get_anniversary,
+    get_anniversary_list,
+    get_ievent,
+    get_yearly_rrule,
+    iter_anniversaries,
+    serialize_ievent,
+)
+
+
+class IterAnniversariesTestCase(SimpleTestCase):
+    """Anniversary iterator test case"""
+
+    def test_window(self) -> None:
+        """Only anniversaries inside the window are yielded, with their ordinal"""
+        anniversaries = list(
+            iter_anniversaries(
+                event_date=date(1935, 6, 15),
+                start_date=date(2024, 1, 1),
+                end_date=date(2026, 12, 31),
+            )
+        )
+        self.assertEqual(
+            anniversaries,
+            [(89, date(2024, 6, 15)), (90, date(2025, 6, 15)), (91, date(2026, 6, 15))],
+        )
+
+    def test_event_date_included(self) -> None:
+        """The event itself is yielded with ordinal 0"""
+        anniversaries = iter_anniversaries(
+            event_date=date(2024, 6, 15),
+            start_date=date(2024, 6, 15),
+            end_date=date(2025, 6, 14),
+        )
+        self.assertEqual(list(anniversaries), [(0, date(2024, 6, 15))])
+
+    def test_leap_day(self) -> None:
+        """February 29 anniversaries fall on March 1 during common years"""
+        anniversaries = iter_anniversaries(
+            event_date=date(2020, 2, 29),
+            start_date=date(2021, 1, 1),
+            end_date=date(2024, 12, 31),
+        )
+        self.assertEqual(
+            [day for _, day in anniversaries],
+            [date(2021, 3, 1), date(2022, 3, 1), date(2023, 3, 1), date(2024, 2, 29)],
+        )
+
+    def test_consistent_with_anniversary_list(self) -> None:
+        """Without window, the iterator matches the anniversary list"""
+        event_date = date(1988, 2, 29)
+        end_date = date(2030, 12, 31)
+        self.assertEqual(
+            list(
+                iter_anniversaries(
+                    event_date=event_date, start_date=event_date, end_date=end_date
+                )
+            ),
+            list(
+                enumerate(
+                    [event_date]
+                    + get_anniversary_list(event_date=event_date, end_date=end_date)
+                )
+            ),
+        )
+
+
+class GetAgeTestCase(SimpleTestCase):
+    """Closed-form age test case"""
+
+    def test_consistent_with_anniversary_list(self) -> None:
+        """The age is the number of anniversaries until the end date"""
+        event_dates = [date(1988, 2, 29), date(1990, 3, 1), date(1985, 12, 31)]
+        end_dates = [
+            date(1980, 1, 1),  # before the event
+            date(2023, 2, 28),
+            date(2023, 3, 1),
+            date(2024, 2, 28),
+            date(2024, 2, 29),
+            date(2024, 12, 30),
+            date(2024, 12, 31),
+        ]
+        for event_date, end_date in product(event_dates, end_dates):
+            with self.subTest(event_date=event_date, end_date=end_date):
+                self.assertEqual(
+                    get_age(event_date=event_date, end_date=end_date),
+                    len(get_anniversary_list(event_date=event_date, end_date=end_date)),
+                )
+
+
+class SerializeIEventTestCase(SimpleTestCase):
+    """Fast-path VEVENT serializer test case"""
+
+    def test_golden(self) -> None:
+        """The serializer output is byte-identical to icalendar's one"""
+        cases = [
+            ("🎂 Jane (89 years)", "Jane Doe was born on Feb. 14, 1938, 89 years ago."),
+            ("", ""),
+            ("a; b, c \\ d\nnew line\r\nCRLF \\N", "x" * 300),
+            ("é" * 100, "🎉" * 40 + "a" * 3 + "🪦" * 40),
+            ("a" * 74, "b" * 148),
+        ]
+        for created_at in [
+            datetime(2024, 3, 18, 18, 33, 5),
+            datetime(2024, 3, 18, 18, 33, 5, tzinfo=UTC),
+            datetime(2024, 3, 18, 18, 33, 5, tzinfo=timezone(timedelta(hours=2))),
+        ]:
+            for (summary, description), rrule in product(
+                cases, ["", "FREQ=YEARLY", "FREQ=YEARLY;UNTIL=20240101;BYYEARDAY=60"]
+            ):
+                values = {
+                    "envent_date": date(2024, 2, 29),
+                    "uid": "6e2f1f5c-2b0e-4c59-9a59-5d6f1a0b8f0e_birthday_36",
+                    "summary": summary,
+                    "description": description,
+                    "rrule": rrule,
+                    "created_at": created_at,
+                }
+                with self.subTest(summary=summary, rrule=rrule, created_at=created_at):
+                    self.assertEqual(
+                        serialize_ievent(**values),  # type: ignore[arg-type]
+                        get_ievent(**values).to_ical(),  # type: ignore[arg-type]
+                    )
+
+
+class YearlyRRuleTestCase(SimpleTestCase):
+    """Yearly recurrence rule test case"""
+
+    def test_occurrences(self) -> None:
+        """Occurrences match anniversary dates, February 29 included"""
+        for event_date in [date(1988, 6, 15), date(1988, 2, 29), date(1989, 3, 1)]:
+            occurrences = rrulestr(
+                get_yearly_rrule(event_date=event_date),
+                dtstart=datetime.combine(event_date, datetime.min.time()),
+            )
+            with self.subTest(event_date=event_date):
+                self.assertEqual(
+                    [occurrence.date() for occurrence in occurrences[:10]],
+                    [
+                        get_anniversary(event_date=event_date, year=year)
+                        for year in range(event_date.year, event_date.year + 10)
+                    ],
+                )
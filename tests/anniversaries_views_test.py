@@ -0,0 +1,275 @@
+"""Test anniversaries views module"""
+
+from datetime import date
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+
+from accounts.models import User
+from anniversaries.cache import (
+    get_cached_icalendar_or_lock,
+    get_icalendar_key,
+    get_icalendar_lock_key,
+    iter_and_cache_icalendar,
+)
+from anniversaries.models import Calendar, Family, Person
+from anniversaries.utils import get_icalendar
+from anniversaries.views import acalendar_detail
+
+
+class CalendarDetailTestCase(TestCase):
+    """Calendar feed view test case"""
+
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="jdoe")
+        family = Family.objects.create(
+            title="Doe", created_by=self.user, changed_by=self.user
+        )
+        for first_name, date_of_birth in [
+            ("Jane", date(1938, 2, 14)),
+            ("John", date(1988, 2, 29)),
+        ]:
+            person = Person.objects.create(
+                first_name=first_name,
+                middle_names=[],
+                date_of_birth=date_of_birth,
+                created_by=self.user,
+                changed_by=self.user,
+            )
+            person.families.add(family)
+        self.calendar = Calendar.objects.create(
+            title="Doe family", created_by=self.user, changed_by=self.user
+        )
+        self.calendar.families.add(family)
+
+    def test_streaming_response(self) -> None:
+        """The feed is streamed and matches the in-memory iCalendar tree"""
+        response = self.client.get(self.calendar.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response.headers["Content-Type"], "text/calendar")
+
+        ical = get_icalendar(title=str(self.calendar))
+        start_date, end_date = self.calendar.get_date_range()
+        for person in self.calendar.people():
+            for ievent in person.get_birthday_ievent_list(
+                start_date=start_date, end_date=end_date
+            ):
+                ical.add_component(ievent)
+        self.assertEqual(response.getvalue(), ical.to_ical())
+
+    def test_conditional_get(self) -> None:
+        """Unchanged calendars are not rebuilt for clients polling them"""
+        response = self.client.get(self.calendar.get_absolute_url())
+        response.getvalue()  # downloads the feed, completing its build
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.calendar.get_absolute_url(), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            self.calendar.get_absolute_url(), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+        person = self.calendar.people().first()
+        assert person is not None
+        person.nickname = "Jo"
+        person.save()
+        response = self.client.get(
+            self.calendar.get_absolute_url(), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_conditional_get_members(self) -> None:
+        """Swapping members of a calendar changes its entity tag"""
+        family = self.calendar.families.get()
+        person = Person.objects.create(
+            first_name="Jim",
+            middle_names=[],
+            date_of_birth=date(1990, 5, 1),
+            created_by=self.user,
+            changed_by=self.user,
+        )
+        # Older than the members, so the last modification date is unchanged:
+        Person.objects.filter(pk=person.pk).update(
+            changed_at=family.changed_at.replace(year=2000)
+        )
+        etag, _last_modified = self.calendar.get_icalendar_validators()
+
+        family.anniversaries_family_members.remove(
+            self.calendar.people().get(first_name="John")
+        )
+        family.anniversaries_family_members.add(person)
+        self.assertNotEqual(self.calendar.get_icalendar_validators()[0], etag)
+
+    def test_cache(self) -> None:
+        """Feeds are cached until one of their people changes"""
+        response = self.client.get(self.calendar.get_absolute_url())
+        self.assertEqual(response.getvalue(), self.calendar.get_icalendar())
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.calendar.get_absolute_url())
+        self.assertFalse(response.streaming)
+
+        person = self.calendar.people().get(first_name="Jane")
+        with self.captureOnCommitCallbacks(execute=True):
+            person.nickname = "Granny"
+            person.save()
+        response = self.client.get(self.calendar.get_absolute_url())
+        self.assertTrue(response.streaming)
+        self.assertIn("Granny".encode(), response.getvalue())
+
+        family = Family.objects.create(
+            title="Smith", created_by=self.user, changed_by=self.user
+        )
+        self.calendar.get_icalendar()
+        with self.captureOnCommitCallbacks(execute=True):
+            person.families.add(family)  # not in the calendar
+        self.assertFalse(self.client.get(self.calendar.get_absolute_url()).streaming)
+        with self.captureOnCommitCallbacks(execute=True):
+            family.anniversaries_calendars.add(self.calendar)
+        self.assertTrue(self.client.get(self.calendar.get_absolute_url()).streaming)
+
+
+class AsyncCalendarDetailTestCase(TestCase):
+    """Async calendar feed view test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        user = User.objects.create(username="jdoe")
+        family = Family.objects.create(title="Doe", created_by=user, changed_by=user)
+        for first_name in ["Jane", "John"]:
+            person = Person.objects.create(
+                first_name=first_name,
+                middle_names=[],
+                date_of_birth=date(1988, 2, 29),
+                date_of_death=date(2020, 1, 1) if first_name == "Jane" else None,
+                created_by=user,
+                changed_by=user,
+            )
+            person.families.add(family)
+        self.calendar = Calendar.objects.create(
+            title="Doe family", created_by=user, changed_by=user
+        )
+        self.calendar.families.add(family)
+        self.factory = AsyncRequestFactory()
+
+    async def get(
+        self, headers: dict[str, str] | None = None
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Returns the status, headers and content of an async feed response."""
+        request = self.factory.get(self.calendar.get_absolute_url(), headers=headers)
+        response = await acalendar_detail(
+            request, calendar_id=self.calendar.pk, filename="doe.ics"
+        )
+        if response.streaming:
+            content = b"".join(
+                [chunk async for chunk in response.streaming_content]  # type: ignore
+            )
+        else:
+            content = response.content  # type: ignore[attr-defined]
+        return response.status_code, dict(response.headers), content
+
+    async def test_same_feed(self) -> None:
+        """The async view serves the same feed as the synchronous one"""
+        expected = await sync_to_async(self.calendar.get_icalendar)()
+        await sync_to_async(cache.clear)()
+        status_code, headers, content = await self.get()
+        self.assertEqual(status_code, 200)
+        self.assertEqual(headers["Content-Type"], "text/calendar")
+        self.assertEqual(content, expected)
+        # From the cache, filled once the feed has been streamed:
+        self.assertEqual((await self.get())[2], expected)
+
+    async def test_conditional_get(self) -> None:
+        """Unchanged calendars are not rebuilt for clients polling them"""
+        _status_code, headers, _content = await self.get()
+        status_code, _headers, content = await self.get(
+            {"If-None-Match": headers["ETag"]}
+        )
+        self.assertEqual(status_code, 304)
+        self.assertEqual(content, b"")
+
+
+class FeedCoalescingTestCase(TestCase):
+    """Concurrent calendar feed builds test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        user = User.objects.create(username="jdoe")
+        family = Family.objects.create(title="Doe", created_by=user, changed_by=user)
+        self.person = Person.objects.create(
+            first_name="Jane",
+            middle_names=[],
+            date_of_birth=date(1938, 2, 14),
+            created_by=user,
+            changed_by=user,
+        )
+        self.person.families.add(family)
+        self.calendar = Calendar.objects.create(
+            title="Doe family", created_by=user, changed_by=user
+        )
+        self.calendar.families.add(family)
+
+    def lock(self) -> str:
+        """Takes the lock on the current feed build, like a concurrent request,
+        and returns the cache key of the feed."""
+        key = get_icalendar_key(self.calendar.pk)
+        self.assertTrue(cache.add(get_icalendar_lock_key(key), "other"))
+        return key
+
+    def test_stale_copy(self) -> None:
+        """The previous feed is served while another request builds the new one"""
+        previous = self.calendar.get_icalendar()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.person.nickname = "Granny"
+            self.person.save()
+        self.lock()
+        response = self.client.get(self.calendar.get_absolute_url())
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content, previous)
+        self.assertIn("Warning", response.headers)
+        self.assertNotIn("ETag", response.headers)
+
+    def test_wait(self) -> None:
+        """Without a previous feed, the new one is awaited"""
+        key = self.lock()
+        with patch(
+            "anniversaries.cache.time.sleep",
+            side_effect=lambda _seconds: cache.set(key, b"BEGIN:VCALENDAR"),
+        ) as sleep:
+            response = self.client.get(self.calendar.get_absolute_url())
+        sleep.assert_called_once()
+        self.assertEqual(response.content, b"BEGIN:VCALENDAR")
+        self.assertNotIn("Warning", response.headers)
+
+    def test_lock_release(self) -> None:
+        """The lock is released if the feed build is aborted, or once it is built"""
+        key = get_icalendar_key(self.calendar.pk)
+        cached = get_cached_icalendar_or_lock(key)
+        self.assertIsNotNone(cached.lock)
+        iter_and_cache_icalendar(
+            key, self.calendar.iter_icalendar(), cached.lock
+        ).close()
+        self.assertIsNone(cache.get(get_icalendar_lock_key(key)))
+        self.client.get(self.calendar.get_absolute_url()).getvalue()
+        self.assertIsNone(cache.get(get_icalendar_lock_key(key)))
+        self.assertIsNotNone(cache.get(key))
+
+    def test_lock_ownership(self) -> None:
+        """Requests tired of waiting build the feed without releasing the lock
+        of the request building it"""
+        key = self.lock()
+        with patch("anniversaries.cache.ICALENDAR_LOCK_WAIT", 0):
+            response = self.client.get(self.calendar.get_absolute_url())
+            self.assertTrue(response.streaming)
+            self.assertEqual(response.getvalue(), self.calendar.get_icalendar())
+        self.assertEqual(cache.get(get_icalendar_lock_key(key)), "other")
+        self.assertIsNotNone(cache.get(key))
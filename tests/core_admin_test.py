@@ -0,0 +1,83 @@
+"""Test core admin module"""
+
+from unittest.mock import patch
+
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connection
+from django.test import TestCase
+
+from accounts.models import User
+from core.admin.paginators import EstimatedCountPaginator
+from core.utils import get_estimated_count
+
+
+class EstimatedCountPaginatorTestCase(TestCase):
+    """Estimated count paginator test case"""
+
+    def setUp(self) -> None:
+        User.objects.bulk_create(
+            [
+                User(username=f"user_{index:02}", is_staff=index % 2 == 0)
+                for index in range(20)
+            ]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {User._meta.db_table}")
+
+    def test_get_estimated_count(self) -> None:
+        """Planner estimates are close to actual counts"""
+        self.assertEqual(get_estimated_count(User.objects.all()), 20)
+        self.assertIsNotNone(get_estimated_count(User.objects.filter(is_staff=True)))
+
+    def test_count(self) -> None:
+        """Counts are exact below the threshold and estimated above"""
+        queryset = User.objects.filter(is_staff=True)
+        self.assertEqual(EstimatedCountPaginator(queryset, 5).count, 10)
+        with patch.object(EstimatedCountPaginator, "threshold", 0):
+            self.assertEqual(
+                EstimatedCountPaginator(queryset, 5).count,
+                get_estimated_count(queryset),
+            )
+
+    def test_overestimated_count(self) -> None:
+        """Pages past the actual objects are clamped to the last page"""
+        queryset = User.objects.order_by("username")
+        with (
+            patch.object(EstimatedCountPaginator, "threshold", 0),
+            patch("core.admin.paginators.get_estimated_count", return_value=50),
+        ):
+            paginator = EstimatedCountPaginator(queryset, 5)
+            self.assertEqual(paginator.num_pages, 10)
+            page = paginator.page(8)
+        self.assertEqual(page.number, 4)
+        self.assertEqual(list(page), list(queryset[15:]))
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.num_pages, 4)
+
+    def test_underestimated_count(self) -> None:
+        """Pages past the estimate are found with the exact count"""
+        queryset = User.objects.order_by("username")
+        with (
+            patch.object(EstimatedCountPaginator, "threshold", 0),
+            patch("core.admin.paginators.get_estimated_count", return_value=5),
+        ):
+            paginator = EstimatedCountPaginator(queryset, 5)
+            self.assertEqual(paginator.num_pages, 1)
+            page = paginator.page(3)
+            self.assertEqual(list(page), list(queryset[10:15]))
+            self.assertEqual(paginator.num_pages, 4)
+            with self.assertRaises(EmptyPage):
+                paginator.page(5)
+
+    def test_deferred_join(self) -> None:
+        """Deep pages have the same objects as with the default paginator"""
+        queryset = User.objects.order_by("-username")
+        paginator = Paginator(queryset, 3)
+        with patch.object(EstimatedCountPaginator, "deferred_join_offset", 0):
+            estimated_count_paginator = EstimatedCountPaginator(queryset, 3)
+            for number in paginator.page_range:
+                with self.subTest(number=number):
+                    self.assertEqual(
+                        list(estimated_count_paginator.page(number)),
+                        list(paginator.page(number)),
+                    )
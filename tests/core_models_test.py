@@ -0,0 +1,48 @@
+"""Test core models module"""
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from accounts.adapter import CustomUserAccountAdapter
+from core.models import SiteCustomization
+from core.models.sites import SITE_VERSION_KEY, get_current_site
+
+
+class CurrentSiteTestCase(TestCase):
+    """Process-local site cache test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.customization = SiteCustomization.objects.create(
+            site=Site.objects.get_current(), is_open_for_signup=True
+        )
+
+    def test_no_query(self) -> None:
+        """The site and its customization are loaded once"""
+        get_current_site()
+        with self.assertNumQueries(0):
+            site = get_current_site()
+            self.assertTrue(site.sitecustomization.is_open_for_signup)  # type: ignore
+            request = RequestFactory().get("/")
+            self.assertTrue(CustomUserAccountAdapter().is_open_for_signup(request))
+
+    def test_invalidation(self) -> None:
+        """Saving the customization reloads the site"""
+        get_current_site()
+        self.customization.is_open_for_signup = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customization.save()
+        site = get_current_site()
+        self.assertFalse(site.sitecustomization.is_open_for_signup)  # type: ignore
+
+    def test_other_process(self) -> None:
+        """A version bumped by another process reloads the site"""
+        get_current_site()
+        SiteCustomization.objects.filter(pk=self.customization.pk).update(
+            is_open_for_signup=False
+        )
+        self.assertTrue(get_current_site().sitecustomization.is_open_for_signup)  # type: ignore
+        cache.incr(SITE_VERSION_KEY)
+        self.assertFalse(get_current_site().sitecustomization.is_open_for_signup)  # type: ignore
@@ -0,0 +1,162 @@
+"""Test core views module"""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.template.response import TemplateResponse
+from django.test.client import RequestFactory
+from django.urls import reverse
+
+from accounts.models import User
+from anniversaries.models import Calendar, Family, Person
+from core.stats import STATS_CACHE_KEY, compute_stats, get_stats
+from core.views import UPCOMING_DAYS, LandingPageView
+
+
+class StatsTestCase(TestCase):
+    """Landing page statistics test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        user = User.objects.create(username="jdoe")
+        User.objects.create(username="inactive", is_active=False)
+        Family.objects.create(created_by=user, changed_by=user)
+        Calendar.objects.create(title="Doe", created_by=user, changed_by=user)
+        for first_name in ["Jane", "John"]:
+            Person.objects.create(
+                first_name=first_name,
+                middle_names=[],
+                created_by=user,
+                changed_by=user,
+            )
+
+    def test_compute_stats(self) -> None:
+        """Statistics are computed with a single query"""
+        with self.assertNumQueries(1):
+            stats = compute_stats()
+        self.assertEqual(
+            stats, {"users": 1, "calendars": 1, "families": 1, "people": 2}
+        )
+
+    def test_estimates(self) -> None:
+        """Large tables are estimated from their statistics"""
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Person._meta.db_table}")
+        with patch("core.stats.ESTIMATED_COUNT_THRESHOLD", 2):
+            self.assertEqual(compute_stats()["people"], 2)
+
+    def test_get_stats(self) -> None:
+        """Statistics are served from a cached snapshot"""
+        get_stats()
+        Person.objects.all().delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_stats()["people"], 2)
+        cache.delete(STATS_CACHE_KEY)
+        self.assertEqual(get_stats()["people"], 0)
+
+
+class LandingPageViewTestCase(TestCase):
+    """Landing page test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.url = reverse("core:landing")
+
+    def test_anonymous_cache(self) -> None:
+        """The page is cached for anonymous visitors"""
+        response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.url)
+        self.assertEqual(cached_response.content, response.content)
+
+    def test_authenticated(self) -> None:
+        """The page is not cached for authenticated users"""
+        self.client.force_login(User.objects.create(username="jdoe"))
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertIn("upcoming_birthdays", response.context)
+
+    def test_messages(self) -> None:
+        """The page is rendered again for anonymous visitors with messages"""
+        self.client.get(self.url)
+        request = RequestFactory().get(self.url)
+        request.user = AnonymousUser()
+        request.site = Site.objects.get_current()  # type: ignore[attr-defined]
+        storage = CookieStorage(request)
+        storage.add(messages.INFO, "Hello")
+        request._messages = storage  # type: ignore[attr-defined]
+        response = LandingPageView.as_view()(request)
+        self.assertIsInstance(response, TemplateResponse)
+
+
+class UpcomingBirthdaysTestCase(TestCase):
+    """Landing page upcoming birthdays test case"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create(username="jdoe")
+        self.family = Family.objects.create(
+            title="Doe", created_by=self.user, changed_by=self.user
+        )
+        birthday = date.today() + timedelta(days=3)
+        self.person = Person.objects.create(
+            first_name="Jane",
+            middle_names=[],
+            date_of_birth=date(birthday.year - 32, birthday.month, birthday.day),
+            created_by=self.user,
+            changed_by=self.user,
+        )
+        self.person.families.add(self.family)
+        for title in ["Doe", "Doe again"]:
+            calendar = Calendar.objects.create(
+                title=title, created_by=self.user, changed_by=self.user
+            )
+            calendar.families.add(self.family)
+
+    def get_upcoming_birthdays(self) -> list[str]:
+        """Returns the first names of people with an upcoming birthday."""
+        birthdays = Calendar.get_owner_next_birthday_list(
+            owner_id=self.user.pk, days=UPCOMING_DAYS
+        )
+        return [person.first_name for person, _age, _date in birthdays]
+
+    def test_cache(self) -> None:
+        """Upcoming birthdays of all calendars are cached, without duplicates"""
+        self.assertEqual(self.get_upcoming_birthdays(), ["Jane"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_upcoming_birthdays(), ["Jane"])
+
+    def test_invalidation(self) -> None:
+        """Upcoming birthdays are computed again when people change"""
+        self.get_upcoming_birthdays()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.person.first_name = "Janet"
+            self.person.save()
+        self.assertEqual(self.get_upcoming_birthdays(), ["Janet"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.person.families.clear()
+        self.assertEqual(self.get_upcoming_birthdays(), [])
+
+    def test_owner_change(self) -> None:
+        """Upcoming birthdays of both owners are computed again when a calendar
+        changes hands"""
+        self.get_upcoming_birthdays()
+        other_user = User.objects.create(username="jsmith")
+        with self.captureOnCommitCallbacks(execute=True):
+            for calendar in Calendar.objects.all():
+                calendar.created_by = other_user
+                calendar.save()
+        self.assertEqual(self.get_upcoming_birthdays(), [])
+        birthdays = Calendar.get_owner_next_birthday_list(
+            owner_id=other_user.pk, days=UPCOMING_DAYS
+        )
+        self.assertEqual(
+            [person.first_name for person, _age, _date in birthdays], ["Jane"]
+        )
@@ -33,6 +33,11 @@ class Settings(BaseSettings):
     site_name: str = "My Toolbox"
 
     api_version: int = 1
+    async_views: bool = Field(
+        default=False,
+        description="Serve calendar feeds with async views, when deployed with "
+        "an ASGI server.",
+    )
 
     superuser_username: str = "demo"
     superuser_password: str = "demo"
@@ -43,6 +48,31 @@ class Settings(BaseSettings):
     postgres_db: str = "postgres"
     postgres_user: str = "postgres"
     postgres_password: str = "postgres"
+    postgres_conn_max_age: int | None = Field(
+        default=60,
+        description="Lifetime in seconds of a persistent connection, reused by the "
+        "next requests of the same worker, 0 to close connections at the end of "
+        "each request, None for unlimited persistent connections. Forced to 0 with "
+        "async views, as ASGI servers would leak them.",
+    )
+    postgres_conn_health_checks: bool = Field(
+        default=True,
+        description="Whether to check that a persistent connection still works "
+        "before reusing it in a new request.",
+    )
+
+    @property
+    def postgres_persistent_conn_max_age(self) -> int | None:
+        """Lifetime of persistent connections, which are only safe under WSGI:
+        ASGI servers run each request in a new thread, with its own connection."""
+        return 0 if self.async_views else self.postgres_conn_max_age
+
+    cache_backend: str = Field(
+        default="django.core.cache.backends.locmem.LocMemCache",
+        description="Use a backend shared by all processes (Redis, Memcached, etc.) "
+        "in production.",
+    )
+    cache_location: str = ""
 
     email_host: str = "localhost"
     email_port: int = 25
@@ -82,6 +112,7 @@ sys.path.append(str(APPS_DIR))
 ROOT_URLCONF: str = "toolbox.urls"
 WSGI_APPLICATION: str = "toolbox.wsgi.application"
 API_VERSION: int = settings.api_version
+ASYNC_VIEWS: bool = settings.async_views
 
 SITE_ID: int = 1
 CUSTOM_SITE_DOMAIN: str = settings.site_domain
@@ -123,7 +154,7 @@ MIDDLEWARE: list[str] = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "django.contrib.sites.middleware.CurrentSiteMiddleware",
+    "core.middleware.CachedSiteMiddleware",
     "allauth.account.middleware.AccountMiddleware",
 ]
 
@@ -152,6 +183,15 @@ DATABASES: dict[str, Any] = {
         "NAME": settings.postgres_db,
         "USER": settings.postgres_user,
         "PASSWORD": settings.postgres_password,
+        "CONN_MAX_AGE": settings.postgres_persistent_conn_max_age,
+        "CONN_HEALTH_CHECKS": settings.postgres_conn_health_checks,
+    }
+}
+
+CACHES: dict[str, Any] = {
+    "default": {
+        "BACKEND": settings.cache_backend,
+        "LOCATION": settings.cache_location,
     }
 }
 